@@ -81,6 +81,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Solve-job workers write concurrently; wait for the lock instead of failing
+        'OPTIONS': {'timeout': 30},
     }
 }
 
@@ -1,31 +1,116 @@
+import logging
+import math
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
 import time
+import tracemalloc
 import psutil
 import uuid
+import numpy as np
 from .problems.knapsack import KnapsackProblem
 from .problems.tsp import TSPProblem
 from .problems.graph_matching import GraphMatchingProblem
-from .models import OptimizationResult, BenchmarkSession
+from .preprocessing import KnapsackReduction
+from .solvers.greedy import GreedySolver
+from .solvers.divide_conquer import DivideConquerSolver
+from .solvers.dynamic_programming import DPSolver
+from .solvers.backtracking import BacktrackingSolver
+from .solvers.branch_bound import BranchBoundSolver
 
-def benchmark_single(SolverClass, problem):
-    """Benchmark a single solver on a problem"""
-    solver = SolverClass(problem)
+try:
+    import resource
+except ImportError:  # Not available on Windows; runs there have no memory cap
+    resource = None
 
-    # Measure time and memory
-    start_time = time.time()
-    process = psutil.Process()
-    mem_before = process.memory_info().rss / 1024 / 1024  # MB
+logger = logging.getLogger(__name__)
 
+SOLVERS = {
+    "Greedy": GreedySolver,
+    "Divide&Conquer": DivideConquerSolver,
+    "DynamicProgramming": DPSolver,
+    "Backtracking": BacktrackingSolver,
+    "Branch&Bound": BranchBoundSolver,
+}
+
+# Wall-clock deadline and address space cap of each isolated solver run
+SOLVER_TIMEOUT = 60
+SOLVER_MEMORY_LIMIT_MB = 4096
+
+# Writing "5" here resets the peak RSS of the process (Linux)
+_CLEAR_REFS = "/proc/self/clear_refs"
+# Its VmHWM line holds that peak RSS
+_PROC_STATUS = "/proc/self/status"
+
+def benchmark_single(SolverClass, problem, preprocess=True, memory=None,
+                     repeat=1, warmup=0, min_time=0.0, **options):
+    """Benchmark a single solver on a problem (options are passed to the solver)
+    
+    Knapsack instances are shrunk by KnapsackReduction before the solver runs
+    unless preprocess is False; the reduction time is part of the runtime.
+    Runtime is wall-clock time (perf_counter_ns) and CPU time (process_time,
+    plus finished child processes). memory selects how the peak is measured:
+    "peak_rss" reads the process's peak resident set size, "tracemalloc"
+    traces Python and NumPy allocations but slows pure-Python solvers down
+    several times. The default is "peak_rss" where the peak can be reset
+    before the run (Linux) and "tracemalloc" elsewhere.
+    
+    With repeat > 1 the solver is timed repeatedly, after warmup untimed
+    runs; each of the repeat samples loops over enough runs to take at least
+    min_time seconds. runtime_sec is then the median time of one run, and
+    runtime_stats() of the samples is part of the result.
+    Returns None when the solver fails.
+    """
     try:
-        solution = solver.solve()
+        return _run_solver(SolverClass, problem, preprocess, memory, repeat, warmup, min_time, **options)
     except Exception as e:
-        print(f"Solver {SolverClass.__name__} failed: {e}")
+        logger.warning("Solver %s failed: %s", SolverClass.__name__, e)
         return None
 
-    mem_after = process.memory_info().rss / 1024 / 1024  # MB
-    end_time = time.time()
+def _run_solver(SolverClass, problem, preprocess=True, memory=None,
+                repeat=1, warmup=0, min_time=0.0, **options):
+    """benchmark_single() without the error handling"""
+    def run():
+        reduction = None
+        if preprocess and isinstance(problem, KnapsackProblem):
+            reduction = KnapsackReduction(problem)
+            solver = SolverClass(reduction.problem, **options)
+        else:
+            solver = SolverClass(problem, **options)
+        solution = solver.solve()
+        if reduction is not None:
+            solution = reduction.expand(solution)
+        return solver, reduction, solution
+
+    for _ in range(warmup):
+        run()
 
-    runtime_sec = end_time - start_time
-    memory_mb = max(0, mem_after - mem_before)  # Ensure non-negative
+    # Memory and CPU time come from the first timed run
+    meter = _PeakMemory(memory)
+    meter.start()
+    cpu_before = _cpu_time()
+    start_ns = time.perf_counter_ns()
+    try:
+        solver, reduction, solution = run()
+    finally:
+        end_ns = time.perf_counter_ns()
+        cpu_sec = _cpu_time() - cpu_before
+        memory_mb = meter.stop()
+
+    samples = [(end_ns - start_ns) / 1e9]
+    loops = 1
+    if repeat > 1 or samples[0] < min_time:
+        # Enough runs per sample to reach min_time; the first run is then only a warmup
+        loops = max(1, math.ceil(min_time / max(samples[0], 1e-9)))
+        if loops > 1:
+            samples = []
+        while len(samples) < repeat:
+            start_ns = time.perf_counter_ns()
+            for _ in range(loops):
+                run()
+            samples.append((time.perf_counter_ns() - start_ns) / 1e9 / loops)
+    stats = runtime_stats(samples)
 
     # Evaluate solution
     try:
@@ -33,42 +118,280 @@ def benchmark_single(SolverClass, problem):
     except:
         objective_value = 0
 
+    # Guaranteed bound on the optimum, reported by approximation modes
+    upper_bound = getattr(solver, "upper_bound", None)
+    if upper_bound is not None and reduction is not None:
+        upper_bound += reduction.fixed_value
+
     return {
-        "algorithm": SolverClass.__name__.replace('Solver', ''),
+        "algorithm": _algorithm_name(SolverClass),
+        "status": "completed",
         "solution": solution,
         "objective_value": objective_value,
+        "runtime_sec": stats["median"],
+        "runtime_stats": stats,
+        "runtime_samples": samples,
+        "loops": loops,
+        "cpu_sec": cpu_sec,
+        "memory_mb": memory_mb,
+        "upper_bound": upper_bound
+    }
+
+def runtime_stats(samples, confidence=0.95, resamples=2000):
+    """Median, min, 95th percentile and a bootstrap confidence interval of the median
+    
+    The interval is the percentile interval of the medians of resamples
+    bootstrap resamples; it is None for fewer than two samples.
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    stats = {
+        "median": float(np.median(samples)),
+        "min": float(samples.min()),
+        "p95": float(np.percentile(samples, 95)),
+        "ci_low": None,
+        "ci_high": None,
+    }
+    if len(samples) > 1:
+        rng = np.random.default_rng(0)  # the same samples always give the same interval
+        picks = rng.integers(0, len(samples), size=(resamples, len(samples)))
+        medians = np.median(samples[picks], axis=1)
+        tail = (1 - confidence) / 2 * 100
+        stats["ci_low"], stats["ci_high"] = np.percentile(medians, [tail, 100 - tail]).tolist()
+    return stats
+
+def _cpu_time():
+    """CPU seconds used by this process and its finished child processes"""
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+class _PeakMemory:
+    """Peak memory in MB used between start() and stop(), above the level at start()"""
+
+    def __init__(self, backend=None):
+        if backend is None:
+            backend = "peak_rss" if os.path.exists(_CLEAR_REFS) else "tracemalloc"
+        if backend not in ("tracemalloc", "peak_rss"):
+            raise ValueError(f"Unknown memory measurement: {backend}")
+        if backend == "peak_rss" and resource is None:
+            backend = "tracemalloc"
+        self.backend = backend
+
+    def start(self):
+        if self.backend == "tracemalloc":
+            self.started_tracing = not tracemalloc.is_tracing()
+            if self.started_tracing:
+                tracemalloc.start()
+            elif hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+                tracemalloc.reset_peak()
+            self.baseline = tracemalloc.get_traced_memory()[0]
+        else:
+            try:
+                with open(_CLEAR_REFS, "w") as f:
+                    f.write("5")
+            except OSError:
+                pass
+            self.baseline = psutil.Process().memory_info().rss
+
+    def stop(self):
+        if self.backend == "tracemalloc":
+            peak = tracemalloc.get_traced_memory()[1]
+            if self.started_tracing:
+                tracemalloc.stop()
+        else:
+            peak = _peak_rss()
+        return max(0, peak - self.baseline) / 1024 / 1024
+
+def _peak_rss():
+    """Peak resident set size of this process in bytes
+    
+    VmHWM is what clear_refs resets. ru_maxrss is only the fallback: it is
+    never reset, and a process started with spawn inherits the parent's value.
+    """
+    try:
+        with open(_PROC_STATUS) as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak * (1 if sys.platform == "darwin" else 1024)  # bytes on macOS, KB elsewhere
+
+def _algorithm_name(SolverClass):
+    return SolverClass.__name__.replace('Solver', '')
+
+def _isolated_run(conn, SolverClass, problem, options, memory_limit_mb, trials):
+    """Entry point of the process running one solver; reports (status, result) on conn"""
+    if resource is not None and memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    try:
+        # The process is the solver's own, so its peak RSS is the solver's peak
+        outcome = ("completed", _run_solver(SolverClass, problem, memory="peak_rss", **trials, **options))
+    except MemoryError:
+        outcome = ("out_of_memory", None)
+    except Exception as e:
+        outcome = ("failed", str(e))
+    conn.send(outcome)
+    conn.close()
+
+def _kill(process):
+    """Kill a solver process together with any workers it started"""
+    try:
+        children = psutil.Process(process.pid).children(recursive=True)
+    except psutil.Error:
+        children = []
+    for child in children:
+        try:
+            child.kill()
+        except psutil.Error:
+            pass
+    process.kill()
+    process.join()
+
+def _unfinished_result(SolverClass, status, runtime_sec):
+    """Result record of a run that produced no solution"""
+    return {
+        "algorithm": _algorithm_name(SolverClass),
+        "status": status,
+        "solution": [],
+        "objective_value": None,
         "runtime_sec": runtime_sec,
-        "memory_mb": memory_mb
+        "runtime_stats": None,
+        "runtime_samples": [],
+        "loops": 0,
+        "cpu_sec": None,
+        "memory_mb": None,
+        "upper_bound": None
     }
 
-def benchmark_multiple(solver_classes, problem, problem_type):
-    """Benchmark multiple solvers on the same problem"""
-    results = []
-    session_id = str(uuid.uuid4())
+def benchmark_isolated(solver_classes, problem, solver_options=None, timeout=SOLVER_TIMEOUT,
+                       memory_limit_mb=SOLVER_MEMORY_LIMIT_MB, max_parallel=None, fresh=False,
+                       trials=None):
+    """Benchmark solvers in parallel on one problem, each in its own process
+    
+    See run_isolated() for the other arguments. Returns one result per
+    solver class, in order.
+    """
+    solver_options = solver_options or {}
+    tasks = [(SolverClass, problem, solver_options.get(SolverClass, {})) for SolverClass in solver_classes]
+    return run_isolated(tasks, timeout, memory_limit_mb, max_parallel, fresh, trials)
+
+def run_isolated(tasks, timeout=SOLVER_TIMEOUT, memory_limit_mb=SOLVER_MEMORY_LIMIT_MB,
+                 max_parallel=None, fresh=False, trials=None):
+    """Run (solver class, problem, solver options) tasks in parallel, each in its own process
+    
+    At most max_parallel processes (default: CPU count) run at once. A run
+    is killed after timeout seconds, and its address space is capped at
+    memory_limit_mb where the platform supports it (RLIMIT_AS). Memory is
+    the peak RSS of the solver's process. With fresh, the processes are
+    started with spawn instead of the platform default, so they do not
+    inherit the parent's heap. trials holds the repeat, warmup and min_time
+    arguments of benchmark_single(); the deadline covers all the trials of a
+    task. Returns one result per task, in order, whose status is completed,
+    timeout, out_of_memory or failed; only completed runs carry a solution.
+    """
+    trials = trials or {}
+    context = multiprocessing.get_context("spawn" if fresh else None)
+    max_parallel = max_parallel or os.cpu_count() or 1
+    results = [None] * len(tasks)
+    pending = list(enumerate(tasks))
+    running = {}  # pipe reader -> (index, solver class, process, start time)
+    
+    while pending or running:
+        while pending and len(running) < max_parallel:
+            index, (SolverClass, problem, options) = pending.pop(0)
+            reader, writer = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_isolated_run,
+                args=(writer, SolverClass, problem, options, memory_limit_mb, trials)
+            )
+            # The deadline starts before start(), which also covers sending the problem to a spawned process
+            started = time.monotonic()
+            process.start()
+            writer.close()  # the reader sees EOF if the process dies without reporting
+            running[reader] = (index, SolverClass, process, started)
+        
+        deadline = min(started for _, _, _, started in running.values()) + timeout
+        ready = multiprocessing.connection.wait(list(running), max(0, deadline - time.monotonic()))
+        for reader in ready:
+            index, SolverClass, process, started = running.pop(reader)
+            try:
+                status, result = reader.recv()
+            except EOFError:
+                status, result = "failed", None
+            reader.close()
+            process.join()
+            if status == "completed":
+                results[index] = result
+            else:
+                if status == "failed":
+                    logger.warning("Solver %s failed: %s", SolverClass.__name__,
+                                   result or f"exit code {process.exitcode}")
+                results[index] = _unfinished_result(SolverClass, status, time.monotonic() - started)
+        
+        now = time.monotonic()
+        for reader, (index, SolverClass, process, started) in list(running.items()):
+            if now - started >= timeout:
+                _kill(process)
+                reader.close()
+                del running[reader]
+                results[index] = _unfinished_result(SolverClass, "timeout", now - started)
+    
+    return results
+
+def benchmark_multiple(solver_classes, problem, problem_type, solver_options=None, session=None,
+                       timeout=SOLVER_TIMEOUT, memory_limit_mb=SOLVER_MEMORY_LIMIT_MB, fresh=False,
+                       trials=None, max_parallel=None):
+    """Benchmark multiple solvers on the same problem
+    
+    solver_options maps a solver class to extra keyword arguments for it,
+    and trials holds repeat, warmup and min_time for repeated timing.
+    The solvers run in parallel under benchmark_isolated(), at most
+    max_parallel at once (default: CPU count), and every run is
+    stored, including the ones that timed out, ran out of memory or failed.
+    Results are stored under session, or under a new BenchmarkSession.
+    """
+    # Imported here so that solver processes started with spawn do not need Django set up
+    from .models import OptimizationResult, BenchmarkSession
     
     # Create benchmark session
     problem_data = serialize_problem(problem, problem_type)
-    session = BenchmarkSession.objects.create(
-        session_id=session_id,
-        problem_type=problem_type,
-        problem_data=problem_data
-    )
+    if session is None:
+        session = BenchmarkSession.objects.create(
+            session_id=str(uuid.uuid4()),
+            problem_type=problem_type,
+            problem_data=problem_data
+        )
+    session_id = session.session_id
     
-    for SolverClass in solver_classes:
-        result = benchmark_single(SolverClass, problem)
-        if result:
-            results.append(result)
-            
-            # Save to database
-            OptimizationResult.objects.create(
-                problem_type=problem_type,
-                algorithm=result["algorithm"],
-                problem_data=problem_data,
-                solution=result["solution"],
-                objective_value=result["objective_value"],
-                runtime_seconds=result["runtime_sec"],
-                memory_mb=result["memory_mb"]
-            )
+    results = benchmark_isolated(solver_classes, problem, solver_options, timeout, memory_limit_mb,
+                                 max_parallel=max_parallel, fresh=fresh, trials=trials)
+    for result in results:
+        stats = result["runtime_stats"] or {}
+        # Save to database
+        OptimizationResult.objects.create(
+            problem_type=problem_type,
+            algorithm=result["algorithm"],
+            status=result["status"],
+            problem_data=problem_data,
+            solution=result["solution"],
+            objective_value=result["objective_value"],
+            runtime_seconds=result["runtime_sec"],
+            runtime_min=stats.get("min"),
+            runtime_p95=stats.get("p95"),
+            runtime_ci_low=stats.get("ci_low"),
+            runtime_ci_high=stats.get("ci_high"),
+            runtime_samples=result["runtime_samples"],
+            loops=result["loops"],
+            cpu_seconds=result["cpu_sec"],
+            memory_mb=result["memory_mb"],
+            upper_bound=result["upper_bound"],
+            session=session
+        )
     
     return results, session_id
 
@@ -87,11 +410,21 @@ def serialize_problem(problem, problem_type):
         }
     elif problem_type == 'matching':
         return {
-            'edges': problem.edges,
-            'vertices': list(problem.vertices)
+            'edges': list(problem.edges),
+            'vertices': problem.labels.tolist()
         }
     return {}
 
+def deserialize_problem(problem_type, data):
+    """Rebuild a problem instance from serialize_problem() output"""
+    if problem_type == 'knapsack':
+        return KnapsackProblem(data['weights'], data['values'], data['capacity'])
+    elif problem_type == 'tsp':
+        return TSPProblem([tuple(city) for city in data['cities']])
+    elif problem_type == 'matching':
+        return GraphMatchingProblem([tuple(edge) for edge in data['edges']])
+    raise ValueError(f"Unsupported problem type: {problem_type}")
+
 def benchmark(SolverClass, weights, values, capacity):
     """Legacy function for backward compatibility"""
     problem = KnapsackProblem(weights, values, capacity)
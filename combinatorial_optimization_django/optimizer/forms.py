@@ -1,4 +1,5 @@
 from django import forms
+from .benchmark import SOLVER_TIMEOUT
 
 ALGO_CHOICES = [
     ('Greedy', 'Greedy'),
@@ -36,6 +37,42 @@ class ProblemForm(forms.Form):
         initial=['Greedy', 'DynamicProgramming']
     )
     
+    # Knapsack approximation (Dynamic Programming only)
+    epsilon = forms.FloatField(
+        label="Approximation ε",
+        required=False,
+        min_value=0.0001,
+        max_value=1,
+        help_text="Knapsack only: Dynamic Programming returns a (1-ε)-optimal solution; leave blank for exact"
+    )
+    
+    # Repeated timing
+    repeat = forms.IntegerField(
+        label="Timed Trials",
+        required=False,
+        initial=1,
+        min_value=1,
+        max_value=100,
+        help_text="Number of timed samples per algorithm; runtimes are reported as median with a 95% confidence interval"
+    )
+    warmup = forms.IntegerField(
+        label="Warmup Runs",
+        required=False,
+        initial=0,
+        min_value=0,
+        max_value=20,
+        help_text="Untimed runs before the timed ones"
+    )
+    min_time = forms.FloatField(
+        label="Minimum Sample Time (s)",
+        required=False,
+        initial=0,
+        min_value=0,
+        max_value=10,
+        help_text=f"Fast algorithms are looped until one sample takes at least this long; "
+                  f"all trials of an algorithm must fit in {SOLVER_TIMEOUT} s"
+    )
+    
     # Knapsack fields
     weights = forms.CharField(
         label="Weights (comma separated)", 
@@ -78,6 +115,25 @@ class ProblemForm(forms.Form):
         help_text="Number of items/cities/vertices to generate"
     )
 
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get("epsilon") and cleaned_data.get("problem_type") != "knapsack":
+            self.add_error("epsilon", "Approximation ε only applies to knapsack problems")
+        
+        # Every timed sample lasts at least min_time; count warmup runs the same way.
+        # All of it has to fit in the deadline of a solver run.
+        repeat = cleaned_data.get("repeat") or 1
+        warmup = cleaned_data.get("warmup") or 0
+        min_time = cleaned_data.get("min_time") or 0.0
+        planned = (repeat + warmup) * min_time
+        if planned >= SOLVER_TIMEOUT:
+            self.add_error("min_time", (
+                f"{repeat} timed trials and {warmup} warmup runs of at least {min_time:g} s take about "
+                f"{planned:g} s, but each algorithm is stopped after {SOLVER_TIMEOUT} s; "
+                f"use fewer trials or a shorter minimum sample time"
+            ))
+        return cleaned_data
+
 class KnapsackForm(forms.Form):
     weights = forms.CharField(label="Weights (comma separated)", required=True)
     values = forms.CharField(label="Values (comma separated)", required=True)
@@ -0,0 +1,109 @@
+import os
+import socket
+import time
+import uuid
+from django.db import connections
+from django.utils import timezone
+from datetime import timedelta
+from .benchmark import SOLVERS, SOLVER_TIMEOUT, benchmark_multiple, serialize_problem, deserialize_problem
+from .models import BenchmarkSession, SolveJob
+
+# Slack on top of the solver deadlines before a running job counts as abandoned
+STALE_JOB_GRACE = 60
+
+
+def submit_job(problem, problem_type, algorithms, solver_options=None, trials=None):
+    """Queue a benchmark run and return its SolveJob; no solver runs here
+
+    solver_options maps an algorithm name to extra keyword arguments for it;
+    trials holds repeat, warmup and min_time for repeated timing.
+    The job id doubles as the id of the session its results are stored under.
+    """
+    job_id = str(uuid.uuid4())
+    session = BenchmarkSession.objects.create(
+        session_id=job_id,
+        problem_type=problem_type,
+        problem_data=serialize_problem(problem, problem_type)
+    )
+    return SolveJob.objects.create(
+        job_id=job_id,
+        session=session,
+        algorithms=list(algorithms),
+        solver_options=solver_options or {},
+        trials=trials or {}
+    )
+
+
+def claim_job(worker):
+    """Mark the oldest queued job as running and return it, or None when there is none
+
+    The status change is a conditional UPDATE, so when several workers race
+    for the same job exactly one of them gets it.
+    """
+    while True:
+        job = SolveJob.objects.filter(status='queued').order_by('created_at').first()
+        if job is None:
+            return None
+        claimed = SolveJob.objects.filter(pk=job.pk, status='queued').update(
+            status='running', worker=worker, started_at=timezone.now())
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def fail_stale_jobs():
+    """Mark running jobs whose worker has evidently died as failed; returns how many
+
+    A job cannot legitimately run longer than SOLVER_TIMEOUT per algorithm
+    plus STALE_JOB_GRACE, since every solver run is killed at its deadline.
+    Such jobs are failed rather than requeued, as the job itself may be what
+    killed the worker.
+    """
+    now = timezone.now()
+    stale = 0
+    for job in SolveJob.objects.filter(status='running', started_at__isnull=False):
+        limit = timedelta(seconds=SOLVER_TIMEOUT * max(1, len(job.algorithms)) + STALE_JOB_GRACE)
+        if job.started_at + limit < now:
+            stale += SolveJob.objects.filter(pk=job.pk, status='running').update(
+                status='failed', finished_at=now,
+                error=f"Worker {job.worker} stopped before finishing the job")
+    return stale
+
+
+def run_job(job, max_parallel=None):
+    """Benchmark the job's solvers and record how it ended
+
+    At most max_parallel solver processes run at once (default: CPU count).
+    """
+    session = job.session
+    try:
+        problem = deserialize_problem(session.problem_type, session.problem_data)
+        solver_classes = [SOLVERS[name] for name in job.algorithms]
+        solver_options = {SOLVERS[name]: options for name, options in job.solver_options.items()}
+        results, _ = benchmark_multiple(solver_classes, problem, session.problem_type,
+                                        solver_options, session=session, trials=job.trials,
+                                        max_parallel=max_parallel)
+        completed = any(result['status'] == 'completed' for result in results)
+        status, error = ('done', '') if completed else ('failed', 'No algorithms completed successfully')
+    except Exception as e:
+        status, error = 'failed', str(e)
+    SolveJob.objects.filter(pk=job.pk).update(status=status, error=error, finished_at=timezone.now())
+
+
+def work(poll_interval=1.0, once=False, max_parallel=None):
+    """Worker loop: run queued jobs one after another
+
+    Sleeps poll_interval seconds whenever the queue is empty; with once, it
+    returns instead. max_parallel is passed on to run_job().
+    """
+    connections.close_all()  # a forked worker must not share its parent's connection
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    while True:
+        fail_stale_jobs()
+        job = claim_job(worker)
+        if job is not None:
+            run_job(job, max_parallel)
+        elif once:
+            return
+        else:
+            time.sleep(poll_interval)
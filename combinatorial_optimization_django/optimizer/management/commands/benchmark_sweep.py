@@ -0,0 +1,200 @@
+import csv
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from optimizer.benchmark import SOLVERS, SOLVER_TIMEOUT, SOLVER_MEMORY_LIMIT_MB, run_isolated
+from optimizer.problems.knapsack import KnapsackProblem
+from optimizer.problems.tsp import TSPProblem
+from optimizer.problems.graph_matching import GraphMatchingProblem
+
+PROBLEMS = {
+    "knapsack": KnapsackProblem,
+    "tsp": TSPProblem,
+    "matching": GraphMatchingProblem,
+}
+
+# Columns of a sweep record, in CSV order
+FIELDS = [
+    "problem_type", "size", "seed", "algorithm", "status", "objective_value",
+    "runtime_sec", "runtime_min", "runtime_p95", "runtime_ci_low", "runtime_ci_high",
+    "samples", "loops", "cpu_sec", "memory_mb",
+]
+
+
+def _record(problem_type, size, seed, name, result):
+    """Flat sweep record of one benchmark result"""
+    stats = result["runtime_stats"] or {}
+    return {
+        "problem_type": problem_type,
+        "size": size,
+        "seed": seed,
+        "algorithm": name,
+        "status": result["status"],
+        "objective_value": result["objective_value"],
+        "runtime_sec": result["runtime_sec"],
+        "runtime_min": stats.get("min"),
+        "runtime_p95": stats.get("p95"),
+        "runtime_ci_low": stats.get("ci_low"),
+        "runtime_ci_high": stats.get("ci_high"),
+        "samples": len(result["runtime_samples"]),
+        "loops": result["loops"],
+        "cpu_sec": result["cpu_sec"],
+        "memory_mb": result["memory_mb"],
+    }
+
+
+def load_records(path):
+    """Records of a sweep written as JSON or CSV (chosen by the file extension)"""
+    with open(path, newline="") as f:
+        if not path.endswith(".csv"):
+            return json.load(f)["results"]
+        records = []
+        for row in csv.DictReader(f):
+            record = {}
+            for field, value in row.items():
+                if field in ("problem_type", "algorithm", "status"):
+                    record[field] = value
+                elif field in ("size", "seed", "samples", "loops"):
+                    record[field] = int(value)
+                else:
+                    record[field] = float(value) if value != "" else None
+            records.append(record)
+        return records
+
+
+def compare(baseline, current, threshold):
+    """Regressions of current against baseline, as (baseline record, current record) pairs
+
+    Runs are matched on problem type, size, seed and algorithm. A run
+    regressed when it no longer completes, or when its median runtime grew
+    by more than threshold (a fraction) and, where both runs have confidence
+    intervals, the intervals do not overlap.
+    """
+    def key(record):
+        return (record["problem_type"], record["size"], record["seed"], record["algorithm"])
+
+    before = {key(record): record for record in baseline}
+    regressions = []
+    for record in current:
+        old = before.get(key(record))
+        if old is None or old["status"] != "completed":
+            continue
+        if record["status"] != "completed":
+            regressions.append((old, record))
+            continue
+        if record["runtime_sec"] <= old["runtime_sec"] * (1 + threshold):
+            continue
+        if None not in (old["runtime_ci_high"], record["runtime_ci_low"]) \
+                and record["runtime_ci_low"] <= old["runtime_ci_high"]:
+            continue  # within the noise of the two measurements
+        regressions.append((old, record))
+    return regressions
+
+
+class Command(BaseCommand):
+    help = ("Benchmark solvers over problem types x sizes x seeds without the web interface, "
+            "and optionally compare the runtimes with an earlier sweep")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--problems', nargs='+', choices=list(PROBLEMS), default=list(PROBLEMS),
+                            help='Problem types to benchmark (default: all)')
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10, 20, 40],
+                            help='Instance sizes passed to generate_random_instance')
+        parser.add_argument('--seeds', nargs='+', type=int, default=[0],
+                            help='Random seeds; each gives one instance per problem type and size')
+        parser.add_argument('--solvers', nargs='+', choices=list(SOLVERS), default=list(SOLVERS),
+                            help='Algorithms to run (default: all)')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Timed samples per run')
+        parser.add_argument('--warmup', type=int, default=1,
+                            help='Untimed runs before the timed ones')
+        parser.add_argument('--min-time', type=float, default=0.01,
+                            help='Minimum seconds per timed sample')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Solver processes run at once (default: CPU count)')
+        parser.add_argument('--timeout', type=float, default=SOLVER_TIMEOUT,
+                            help='Seconds before a run is killed and recorded as timed out')
+        parser.add_argument('--memory-limit', type=int, default=SOLVER_MEMORY_LIMIT_MB,
+                            help='Address space cap of each run in MB')
+        parser.add_argument('--output', default='-',
+                            help='File to write the results to (default: standard output)')
+        parser.add_argument('--format', choices=['json', 'csv'],
+                            help='Output format (default: from the output file extension, else json)')
+        parser.add_argument('--baseline',
+                            help='Results of an earlier sweep (JSON or CSV) to check for regressions')
+        parser.add_argument('--threshold', type=float, default=0.1,
+                            help='Median runtime growth over the baseline that counts as a regression '
+                                 '(fraction, default: 0.1)')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        fmt = options['format'] or ('csv' if output.endswith('.csv') else 'json')
+        # Keep standard output for the results when they are written there
+        log = self.stderr if output == '-' else self.stdout
+        baseline = load_records(options['baseline']) if options['baseline'] else None
+
+        # One generated instance per (problem type, size, seed), shared by all solvers
+        tasks = []
+        labels = []
+        for problem_type in options['problems']:
+            for size in options['sizes']:
+                for seed in options['seeds']:
+                    random.seed(seed)
+                    problem = PROBLEMS[problem_type].generate_random_instance(size)
+                    for name in options['solvers']:
+                        tasks.append((SOLVERS[name], problem, {}))
+                        labels.append((problem_type, size, seed, name))
+
+        log.write(f"Running {len(tasks)} benchmarks on {options['workers']} worker(s)")
+        trials = {
+            "repeat": options['repeat'],
+            "warmup": options['warmup'],
+            "min_time": options['min_time'],
+        }
+        results = run_isolated(tasks, options['timeout'], options['memory_limit'],
+                               max_parallel=options['workers'], trials=trials)
+        records = [_record(*label, result) for label, result in zip(labels, results)]
+
+        if output == '-':
+            self._write(sys.stdout, fmt, records, options)
+        else:
+            with open(output, 'w', newline='') as f:
+                self._write(f, fmt, records, options)
+            log.write(f"Wrote {len(records)} results to {output}")
+
+        if baseline is None:
+            return
+        regressions = compare(baseline, records, options['threshold'])
+        for old, new in regressions:
+            where = f"{new['problem_type']} size={new['size']} seed={new['seed']} {new['algorithm']}"
+            if new['status'] != 'completed':
+                log.write(f"REGRESSION {where}: {new['status']} (baseline completed)")
+            else:
+                growth = new['runtime_sec'] / old['runtime_sec'] - 1 if old['runtime_sec'] else float('inf')
+                log.write(f"REGRESSION {where}: {old['runtime_sec']:.6f}s -> "
+                          f"{new['runtime_sec']:.6f}s ({growth:+.1%})")
+        if regressions:
+            raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
+        log.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
+
+    def _write(self, f, fmt, records, options):
+        if fmt == 'csv':
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+            return
+        settings = {name: options[name] for name in (
+            'problems', 'sizes', 'seeds', 'solvers', 'repeat', 'warmup', 'min_time', 'timeout', 'memory_limit')}
+        json.dump({
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "settings": settings,
+            "results": records,
+        }, f, indent=2)
+        f.write("\n")
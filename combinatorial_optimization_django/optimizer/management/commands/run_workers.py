@@ -0,0 +1,49 @@
+import multiprocessing
+import os
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _worker_main(poll_interval, once, max_parallel):
+    # Under the spawn start method the child starts with no Django setup
+    import django
+    django.setup()
+    from optimizer.jobs import work
+    work(poll_interval=poll_interval, once=once, max_parallel=max_parallel)
+
+
+class Command(BaseCommand):
+    help = "Run worker processes that execute the solve jobs queued by the web form"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Number of worker processes (default: 1); each job already runs its '
+                                 'solvers in parallel, on CPU count / workers processes')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait before checking an empty queue again')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        poll_interval = options['poll_interval']
+        once = options['once']
+        # Solver processes per job, so that all workers together use each CPU once
+        max_parallel = max(1, (os.cpu_count() or 1) // workers)
+        self.stdout.write(f"Starting {workers} worker(s)")
+        if workers == 1:
+            from optimizer.jobs import work
+            work(poll_interval=poll_interval, once=once, max_parallel=max_parallel)
+            return
+
+        connections.close_all()  # children open their own
+        processes = [multiprocessing.Process(target=_worker_main, args=(poll_interval, once, max_parallel))
+                     for _ in range(workers)]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
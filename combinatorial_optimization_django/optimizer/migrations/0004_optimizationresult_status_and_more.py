@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('optimizer', '0003_optimizationresult_session_solvejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='optimizationresult',
+            name='status',
+            field=models.CharField(choices=[('completed', 'Completed'), ('timeout', 'Timed out'), ('out_of_memory', 'Out of memory'), ('failed', 'Failed')], default='completed', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='optimizationresult',
+            name='memory_mb',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='optimizationresult',
+            name='objective_value',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('optimizer', '0004_optimizationresult_status_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='optimizationresult',
+            name='cpu_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('optimizer', '0005_optimizationresult_cpu_seconds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='optimizationresult',
+            name='loops',
+            field=models.IntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='optimizationresult',
+            name='runtime_ci_high',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='optimizationresult',
+            name='runtime_ci_low',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='optimizationresult',
+            name='runtime_min',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='optimizationresult',
+            name='runtime_p95',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='optimizationresult',
+            name='runtime_samples',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='solvejob',
+            name='trials',
+            field=models.JSONField(default=dict),
+        ),
+    ]
@@ -8,13 +8,31 @@ class OptimizationResult(models.Model):
         ('matching', 'Graph Matching Problem'),
     ]
     
+    STATUSES = [
+        ('completed', 'Completed'),
+        ('timeout', 'Timed out'),
+        ('out_of_memory', 'Out of memory'),
+        ('failed', 'Failed'),
+    ]
+    
     problem_type = models.CharField(max_length=20, choices=PROBLEM_TYPES)
     algorithm = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=STATUSES, default='completed')
     problem_data = models.JSONField()  # Store problem instance data
     solution = models.JSONField()  # Store solution
-    objective_value = models.FloatField()  # Solution quality
-    runtime_seconds = models.FloatField()
-    memory_mb = models.FloatField()
+    objective_value = models.FloatField(null=True, blank=True)  # Solution quality (None unless completed)
+    runtime_seconds = models.FloatField()  # Wall-clock time (median over repeated trials)
+    runtime_min = models.FloatField(null=True, blank=True)
+    runtime_p95 = models.FloatField(null=True, blank=True)
+    runtime_ci_low = models.FloatField(null=True, blank=True)  # Bootstrap confidence interval of the median
+    runtime_ci_high = models.FloatField(null=True, blank=True)
+    runtime_samples = models.JSONField(default=list)  # Seconds per run of each timed sample
+    loops = models.IntegerField(default=1)  # Runs per timed sample
+    cpu_seconds = models.FloatField(null=True, blank=True)  # CPU time, including worker processes
+    memory_mb = models.FloatField(null=True, blank=True)
+    upper_bound = models.FloatField(null=True, blank=True)  # Guaranteed bound on the optimum (approximations)
+    session = models.ForeignKey('BenchmarkSession', null=True, blank=True,
+                                on_delete=models.SET_NULL, related_name='results')
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -31,3 +49,34 @@ class BenchmarkSession(models.Model):
     
     def __str__(self):
         return f"Session {self.session_id} - {self.problem_type}"
+
+class SolveJob(models.Model):
+    """A benchmark run queued by the web form and executed by `manage.py run_workers`"""
+    STATUSES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    job_id = models.CharField(max_length=100, unique=True)
+    session = models.OneToOneField(BenchmarkSession, on_delete=models.CASCADE, related_name='job')
+    algorithms = models.JSONField()  # Keys of benchmark.SOLVERS
+    solver_options = models.JSONField(default=dict)  # Algorithm name -> solver keyword arguments
+    trials = models.JSONField(default=dict)  # repeat, warmup and min_time for repeated timing
+    status = models.CharField(max_length=20, choices=STATUSES, default='queued')
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)  # host:pid of the worker that claimed it
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['created_at']
+    
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+    
+    def __str__(self):
+        return f"Job {self.job_id} - {self.status}"
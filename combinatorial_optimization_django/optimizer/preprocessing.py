@@ -0,0 +1,161 @@
+from collections import defaultdict
+from .problems.knapsack import KnapsackProblem, FractionalBound
+
+
+class KnapsackReduction:
+    """Shrinks a knapsack instance before it is handed to a solver
+
+    The reduced instance is available as `problem`; `expand()` maps a solution
+    of it back to indices of the original instance. The reductions are:
+    1. items heavier than the capacity or without value are removed, free items are taken
+    2. dominated items are removed
+    3. duplicate items are collapsed into power-of-two bundles
+    4. items are fixed to 0 or 1 when the LP bound proves they cannot go the other way
+    """
+
+    def __init__(self, problem):
+        self.original = problem
+        self.fixed = []  # original indices that are always taken
+        weights = problem.weights
+        values = problem.values
+        capacity = problem.capacity
+
+        if capacity < 0:
+            self.groups = [[i] for i in range(len(values))]
+            self.problem = problem
+            return
+
+        # 1. useless and free items
+        candidates = []
+        for i in range(len(values)):
+            if weights[i] > capacity or values[i] <= 0:
+                continue
+            if weights[i] <= 0:
+                self.fixed.append(i)
+            else:
+                candidates.append(i)
+        capacity -= sum(weights[i] for i in self.fixed)
+
+        candidates = self._remove_dominated(candidates, weights, values, capacity)
+        groups = self._bundle_duplicates(candidates, weights, values, capacity)
+        group_weights = [sum(weights[i] for i in group) for group in groups]
+        group_values = [sum(values[i] for i in group) for group in groups]
+
+        # 4. bound-based fixing
+        fix_in, fix_out = self._fix_by_bounds(group_weights, group_values, capacity)
+        for k in fix_in:
+            self.fixed.extend(groups[k])
+            capacity -= group_weights[k]
+        free = [k for k in range(len(groups))
+                if k not in fix_in and k not in fix_out and group_weights[k] <= capacity]
+
+        self.groups = [groups[k] for k in free]
+        self.problem = KnapsackProblem([group_weights[k] for k in free],
+                                       [group_values[k] for k in free],
+                                       capacity)
+
+    @property
+    def fixed_value(self):
+        """Value contributed by the items fixed to 1"""
+        return sum(self.original.values[i] for i in self.fixed)
+
+    def expand(self, solution):
+        """Map a solution of the reduced problem to original item indices"""
+        items = list(self.fixed)
+        for k in solution:
+            items.extend(self.groups[k])
+        return sorted(items)
+
+    @staticmethod
+    def _remove_dominated(items, weights, values, capacity):
+        """Drop items that can always be swapped for a dominating item
+
+        Item j is dominated by the items that come before it when sorted by
+        (weight, -value, index) and are at least as valuable. If j cannot be
+        packed together with all of them, any packing that uses j leaves one
+        of them out, and swapping it in for j is never worse.
+        """
+        order = sorted(items, key=lambda i: (weights[i], -values[i], i))
+        # Fenwick tree over value ranks (rank 1 = most valuable) summing weights
+        ranks = {v: r for r, v in enumerate(sorted({values[i] for i in items}, reverse=True), 1)}
+        tree = [0] * (len(ranks) + 1)
+        kept = []
+        for j in order:
+            r = ranks[values[j]]
+            dominating_weight = 0
+            k = r
+            while k > 0:
+                dominating_weight += tree[k]
+                k -= k & -k
+            if weights[j] + dominating_weight <= capacity:
+                kept.append(j)
+            k = r
+            while k < len(tree):
+                tree[k] += weights[j]
+                k += k & -k
+        return sorted(kept)
+
+    @staticmethod
+    def _bundle_duplicates(items, weights, values, capacity):
+        """Group identical items into bundles of 1, 2, 4, ... copies
+
+        Any number of copies up to the group size is still a subset of bundles.
+        Bundles that cannot fit are dropped; the smaller bundles still cover
+        every count that fits.
+        """
+        duplicates = defaultdict(list)
+        for i in items:
+            duplicates[weights[i], values[i]].append(i)
+
+        groups = []
+        for (weight, _), indices in duplicates.items():
+            size = 1
+            while indices:
+                bundle, indices = indices[:size], indices[size:]
+                if weight * len(bundle) <= capacity:
+                    groups.append(bundle)
+                size *= 2
+        return groups
+
+    @staticmethod
+    def _fix_by_bounds(weights, values, capacity):
+        """Items whose value is decided by comparing LP bounds with a greedy packing
+
+        An item is fixed to 0 when the LP bound with it forced in is below the
+        greedy value (and to 1 when forcing it out is), so every packing at
+        least as good as the greedy one agrees with the fixing.
+        """
+        n = len(weights)
+        instance = KnapsackProblem(weights, values, capacity)
+        order = instance.density_order()
+        w = [weights[k] for k in order]
+        v = [values[k] for k in order]
+        relaxation = FractionalBound(w, v)
+
+        lower = sum(values[k] for k in instance.greedy_packing(order))
+        lower -= 1e-9 * max(1, abs(lower))  # only fix on a strict gap
+
+        # critical item: the first one the LP cannot take completely
+        critical = 0
+        total_weight = 0
+        while critical < n and total_weight + w[critical] <= capacity:
+            total_weight += w[critical]
+            critical += 1
+
+        fix_in, fix_out = set(), set()
+        for p in range(n):
+            if p < critical:
+                # forcing p out frees w[p] for the items after it
+                if relaxation(0, capacity + w[p]) - v[p] < lower:
+                    fix_in.add(order[p])
+            elif p > critical:
+                # forcing p in only shrinks the capacity of the items before it
+                if v[p] + relaxation(0, capacity - w[p]) < lower:
+                    fix_out.add(order[p])
+            else:
+                others = FractionalBound(w[:p] + w[p + 1:], v[:p] + v[p + 1:])
+                if others(0, capacity) < lower:
+                    fix_in.add(order[p])
+                elif v[p] + others(0, capacity - w[p]) < lower:
+                    fix_out.add(order[p])
+        return fix_in, fix_out
@@ -1,56 +1,208 @@
 import random
-from typing import List, Tuple, Set
+from collections.abc import Sequence
+from typing import List, Tuple
+import numpy as np
+
+
+class EdgeView(Sequence):
+    """Read-only list of (u, v, weight) tuples backed by the problem's arrays"""
+
+    def __init__(self, problem):
+        self._problem = problem
+
+    def __len__(self):
+        return len(self._problem.w)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[i] for i in range(*k.indices(len(self)))]
+        p = self._problem
+        return (p.labels[p.u[k]].item(), p.labels[p.v[k]].item(), p.w[k].item())
+
+    def __iter__(self):
+        p = self._problem
+        return zip(p.labels[p.u].tolist(), p.labels[p.v].tolist(), p.w.tolist())
+
 
 class GraphMatchingProblem:
-    """Maximum Weight Matching Problem implementation"""
-    
+    """Maximum Weight Matching Problem implementation
+
+    Edges are stored as arrays: edge k joins vertices u[k] and v[k] (ids
+    0..n_vertices-1, whose original names are labels[id]) with weight w[k].
+    `edges` still reads as a list of (u, v, weight) tuples in original names.
+    """
+
     def __init__(self, edges: List[Tuple[int, int, float]]):
         """
         Initialize with list of edges (u, v, weight)
         """
-        self.edges = edges
-        self.vertices = set()
-        for u, v, _ in edges:
-            self.vertices.add(u)
-            self.vertices.add(v)
-        self.n_vertices = len(self.vertices)
-    
+        if len(edges):
+            ends_u, ends_v, weights = zip(*edges)
+        else:
+            ends_u = ends_v = weights = ()
+        self._set_arrays(np.asarray(ends_u), np.asarray(ends_v), np.asarray(weights))
+
+    @classmethod
+    def from_arrays(cls, u, v, w):
+        """Build a problem from endpoint and weight arrays without going through tuples"""
+        problem = cls.__new__(cls)
+        problem._set_arrays(np.asarray(u), np.asarray(v), np.asarray(w))
+        return problem
+
+    def __reduce__(self):
+        # Pickle only the edge arrays (e.g. for solver processes), not the cached adjacency
+        return (self.__class__.from_arrays, (self.labels[self.u], self.labels[self.v], self.w))
+
+    def _set_arrays(self, ends_u, ends_v, weights):
+        ends = np.concatenate((ends_u, ends_v))
+        if ends.dtype.kind in 'iu' and len(ends) and 0 <= ends.min() and ends.max() <= 2 * len(ends):
+            # Small non-negative integer names: renumber with a presence table instead of sorting
+            present = np.zeros(int(ends.max()) + 1, dtype=bool)
+            present[ends] = True
+            self.labels = np.flatnonzero(present)
+            ids = (np.cumsum(present, dtype=np.int32) - 1)[ends]
+        else:
+            self.labels, ids = np.unique(ends, return_inverse=True)
+            ids = ids.astype(np.int32)
+        self.u = ids[:len(ends_u)]
+        self.v = ids[len(ends_u):]
+        self.w = weights if weights.dtype.kind in 'iu' else weights.astype(np.float64)
+        self.n_vertices = len(self.labels)
+        self.edges = EdgeView(self)
+        self._adjacency = None
+        self._vertices = None
+        self._sides = None
+
+    @property
+    def vertices(self):
+        """Set of vertex names"""
+        if self._vertices is None:
+            self._vertices = set(self.labels.tolist())
+        return self._vertices
+
+    def adjacency(self):
+        """CSR adjacency: the edges at vertex x are edge_ids[offsets[x]:offsets[x + 1]]
+
+        Returns (offsets, neighbors, edge_ids); neighbors holds the far end of
+        each of those edges. The edges of a vertex are listed heaviest first.
+        Built on first use and shared by all solvers.
+        """
+        if self._adjacency is None:
+            m = len(self.w)
+            ends = np.concatenate((self.u, self.v))
+            order = np.lexsort((-np.concatenate((self.w, self.w)), ends))
+            offsets = np.zeros(self.n_vertices + 1, dtype=np.int64)
+            np.cumsum(np.bincount(ends, minlength=self.n_vertices), out=offsets[1:])
+            edge_ids = (order % m).astype(np.int32) if m else order.astype(np.int32)
+            neighbors = np.concatenate((self.v, self.u))[order]
+            self._adjacency = (offsets, neighbors, edge_ids)
+        return self._adjacency
+
+    def bipartition(self):
+        """Side (0 or 1) of every vertex when the graph is bipartite, otherwise None
+
+        Each connected component is two-coloured by breadth-first search over
+        the CSR adjacency, stopping at the first edge inside one side (a loop
+        counts as one). Computed on first use.
+        """
+        if self._sides is None:
+            offsets, neighbors, _ = self.adjacency()
+            offsets = offsets.tolist()
+            neighbors = neighbors.tolist()
+            side = [-1] * self.n_vertices
+            bipartite = True
+            for root in range(self.n_vertices):
+                if side[root] != -1:
+                    continue
+                side[root] = 0
+                queue = [root]
+                for x in queue:
+                    other = 1 - side[x]
+                    for y in neighbors[offsets[x]:offsets[x + 1]]:
+                        if side[y] == -1:
+                            side[y] = other
+                            queue.append(y)
+                        elif side[y] != other:
+                            bipartite = False
+                            break
+                    if not bipartite:
+                        break
+                if not bipartite:
+                    break
+            self._sides = np.array(side, dtype=np.int8) if bipartite else False
+        return None if self._sides is False else self._sides
+
+    def components(self):
+        """Edge indices of every connected component of the graph (union-find)"""
+        parent = list(range(self.n_vertices))
+
+        def find(x):
+            while x != parent[x]:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        ends_u = self.u.tolist()
+        for u, v in zip(ends_u, self.v.tolist()):
+            parent[find(u)] = find(v)
+        roots = np.array([find(u) for u in ends_u], dtype=np.int64)
+        order = np.argsort(roots, kind='stable')
+        bounds = np.flatnonzero(np.diff(roots[order])) + 1
+        return [component.tolist() for component in np.split(order, bounds)] if len(order) else []
+
     def is_valid_matching(self, matching: List[int]) -> bool:
         """Check if the matching is valid (no vertex appears twice)"""
-        used_vertices = set()
-        for edge_idx in matching:
-            if edge_idx >= len(self.edges):
-                return False
-            u, v, _ = self.edges[edge_idx]
-            if u in used_vertices or v in used_vertices:
-                return False
-            used_vertices.add(u)
-            used_vertices.add(v)
-        return True
-    
+        indices = np.asarray(matching, dtype=np.int64)
+        if len(indices) == 0:
+            return True
+        if indices.min() < 0 or indices.max() >= len(self.w):
+            return False
+        ends = np.concatenate((self.u[indices], self.v[indices]))
+        return len(np.unique(ends)) == len(ends)
+
     def calculate_matching_weight(self, matching: List[int]) -> float:
         """Calculate total weight of matching"""
         if not self.is_valid_matching(matching):
             return 0
-        
-        total_weight = 0
-        for edge_idx in matching:
-            _, _, weight = self.edges[edge_idx]
-            total_weight += weight
-        return total_weight
-    
+        return self.w[np.asarray(matching, dtype=np.int64)].sum().item()
+
     def evaluate(self, solution: List[int]) -> float:
         """Evaluate solution quality (higher is better for matching)"""
         return self.calculate_matching_weight(solution)
-    
+
     @classmethod
     def generate_random_instance(cls, num_vertices: int, edge_probability: float = 0.3):
-        """Generate random graph matching instance"""
-        edges = []
-        edge_id = 0
-        for u in range(num_vertices):
-            for v in range(u + 1, num_vertices):
-                if random.random() < edge_probability:
-                    weight = random.uniform(1, 100)
-                    edges.append((u, v, weight))
-        return cls(edges)
\ No newline at end of file
+        """Generate random graph matching instance
+
+        Each of the n(n-1)/2 vertex pairs is an edge with the given probability.
+        Instead of one draw per pair, the gaps between chosen pairs are drawn
+        from the geometric distribution (skip sampling), so the cost is linear
+        in the number of edges.
+        """
+        rng = np.random.default_rng(random.getrandbits(64))
+        n = num_vertices
+        pairs = n * (n - 1) // 2
+        p = min(edge_probability, 1.0)
+        if pairs == 0 or p <= 0:
+            return cls([])
+
+        # Pair indices in row-major order of the upper triangle
+        chunks = []
+        last = -1
+        expected = pairs * p
+        while last < pairs:
+            gaps = rng.geometric(p, size=int(expected + 4 * expected ** 0.5) + 16)
+            positions = last + np.cumsum(gaps)
+            last = positions[-1]
+            chunks.append(positions[positions < pairs])
+            expected = (pairs - last) * p
+        index = np.concatenate(chunks)
+
+        # Row u starts at pair index u * (2n - u - 1) / 2
+        rows = np.arange(n, dtype=np.int64)
+        starts = rows * (2 * n - rows - 1) // 2
+        u = np.searchsorted(starts, index, side='right') - 1
+        v = (index - starts[u] + u + 1).astype(np.int32)
+        u = u.astype(np.int32)
+        weights = rng.uniform(1, 100, size=len(index))
+        return cls.from_arrays(u, v, weights)
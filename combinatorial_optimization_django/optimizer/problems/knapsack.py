@@ -1,4 +1,7 @@
+import math
 import random
+from bisect import bisect_right
+from itertools import accumulate
 
 class KnapsackProblem:
     def __init__(self, weights, values, capacity):
@@ -9,6 +12,26 @@ class KnapsackProblem:
     def evaluate(self, solution):
         return sum(self.values[i] for i in solution)
     
+    def density_order(self):
+        """Item indices sorted by value/weight ratio, best first"""
+        def density(i):
+            if self.weights[i] == 0:
+                return float('inf')
+            return self.values[i] / self.weights[i]
+        return sorted(range(len(self.values)), key=density, reverse=True)
+    
+    def greedy_packing(self, order=None):
+        """Items taken one by one in order (default: density order), skipping those that no longer fit"""
+        if order is None:
+            order = self.density_order()
+        packing = []
+        total_weight = 0
+        for i in order:
+            if total_weight + self.weights[i] <= self.capacity:
+                total_weight += self.weights[i]
+                packing.append(i)
+        return packing
+    
     def is_valid_solution(self, solution):
         """Check if solution is valid (doesn't exceed capacity)"""
         total_weight = sum(self.weights[i] for i in solution)
@@ -21,3 +44,28 @@ class KnapsackProblem:
         values = [random.randint(1, max_value) for _ in range(num_items)]
         capacity = sum(weights) // 2  # Set capacity to roughly half of total weight
         return cls(weights, values, capacity)
+
+
+class FractionalBound:
+    """Dantzig bound: LP relaxation value of items taken in density order"""
+
+    def __init__(self, weights, values):
+        """Weights and values must already be sorted by decreasing value/weight ratio"""
+        self.weights = weights
+        self.values = values
+        # With whole-number values no packing can beat the rounded-down bound
+        self.integral = all(float(v).is_integer() for v in values)
+        self.prefix_weights = list(accumulate(weights, initial=0))
+        self.prefix_values = list(accumulate(values, initial=0))
+
+    def __call__(self, start, capacity):
+        """Upper bound on the value of items[start:] packed into capacity"""
+        limit = self.prefix_weights[start] + capacity
+        # items start..j-1 fit completely, item j (if any) is the fractional one
+        j = bisect_right(self.prefix_weights, limit, lo=start) - 1
+        bound = self.prefix_values[j] - self.prefix_values[start]
+        if j < len(self.weights):
+            bound += (limit - self.prefix_weights[j]) * self.values[j] / self.weights[j]
+            if self.integral:
+                bound = math.floor(bound + 1e-9)
+        return bound
@@ -1,6 +1,38 @@
-import math
 import random
+from collections import OrderedDict
 from typing import List, Tuple
+import numpy as np
+
+# Above this many cities distances are computed on demand instead of stored
+LAZY_DISTANCE_THRESHOLD = 5000
+# Above this many cities a stored matrix uses float32 to halve its size
+FLOAT32_DISTANCE_THRESHOLD = 2000
+
+
+class LazyDistanceMatrix:
+    """Distance matrix view that computes rows from coordinates on demand"""
+    
+    def __init__(self, coords: np.ndarray, cache_size: int = 64):
+        self.coords = coords
+        self.n = len(coords)
+        self.cache_size = cache_size
+        self._rows = OrderedDict()  # most recently used rows
+    
+    def __len__(self):
+        return self.n
+    
+    def __getitem__(self, i):
+        row = self._rows.get(i)
+        if row is None:
+            x, y = self.coords[i]
+            row = np.hypot(self.coords[:, 0] - x, self.coords[:, 1] - y)
+            self._rows[i] = row
+            if len(self._rows) > self.cache_size:
+                self._rows.popitem(last=False)
+        else:
+            self._rows.move_to_end(i)
+        return row
+
 
 class TSPProblem:
     """Traveling Salesman Problem implementation"""
@@ -8,30 +40,60 @@ class TSPProblem:
     def __init__(self, cities: List[Tuple[float, float]]):
         self.cities = cities
         self.n = len(cities)
+        self.coords = np.asarray(cities, dtype=np.float64).reshape(self.n, 2)
         self.distance_matrix = self._calculate_distance_matrix()
     
+    @classmethod
+    def from_coords(cls, coords):
+        """Build a problem from an (n, 2) coordinate array whose distances are only computed on demand
+        
+        For solvers that only read coordinates, such as the greedy tours of a
+        decomposition's regions, this skips the n^2 matrix.
+        """
+        problem = cls.__new__(cls)
+        problem.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        problem.n = len(problem.coords)
+        problem.cities = problem.coords.tolist()
+        problem.distance_matrix = LazyDistanceMatrix(problem.coords)
+        return problem
+    
+    def __reduce__(self):
+        # Pickle only the cities (e.g. for solver processes); the matrix is rebuilt on load
+        return (self.__class__, (self.cities,))
+    
     def _calculate_distance_matrix(self):
-        """Calculate distance matrix between all cities"""
-        matrix = [[0] * self.n for _ in range(self.n)]
-        for i in range(self.n):
-            for j in range(self.n):
-                if i != j:
-                    x1, y1 = self.cities[i]
-                    x2, y2 = self.cities[j]
-                    matrix[i][j] = math.sqrt((x1 - x2)**2 + (y1 - y2)**2)
+        """Calculate distance matrix between all cities
+        
+        Large instances get a LazyDistanceMatrix instead of n^2 stored values.
+        """
+        if self.n > LAZY_DISTANCE_THRESHOLD:
+            return LazyDistanceMatrix(self.coords)
+        dtype = np.float32 if self.n > FLOAT32_DISTANCE_THRESHOLD else np.float64
+        matrix = np.empty((self.n, self.n), dtype=dtype)
+        x = self.coords[:, 0]
+        y = self.coords[:, 1]
+        # Row blocks keep the float64 temporaries small
+        block = 256
+        for start in range(0, self.n, block):
+            stop = min(start + block, self.n)
+            matrix[start:stop] = np.hypot(x[start:stop, None] - x, y[start:stop, None] - y)
         return matrix
     
+    def cheapest_edges(self):
+        """Lengths of the shortest and second shortest edge at every city"""
+        matrix = np.array(self.distance_matrix, dtype=np.float64)
+        np.fill_diagonal(matrix, np.inf)
+        smallest = np.partition(matrix, 1, axis=1)
+        return smallest[:, 0], smallest[:, 1]
+    
     def calculate_tour_distance(self, tour: List[int]) -> float:
         """Calculate total distance of a tour"""
         if not tour or len(tour) < 2:
             return float('inf')
         
-        total_distance = 0
-        for i in range(len(tour)):
-            current_city = tour[i]
-            next_city = tour[(i + 1) % len(tour)]
-            total_distance += self.distance_matrix[current_city][next_city]
-        return total_distance
+        points = self.coords[np.asarray(tour)]
+        steps = points - np.roll(points, -1, axis=0)
+        return float(np.hypot(steps[:, 0], steps[:, 1]).sum())
     
     def evaluate(self, solution: List[int]) -> float:
         """Evaluate solution quality (lower is better for TSP)"""
@@ -42,4 +104,4 @@ class TSPProblem:
         """Generate random TSP instance"""
         cities = [(random.uniform(0, max_coord), random.uniform(0, max_coord)) 
                  for _ in range(num_cities)]
-        return cls(cities)
\ No newline at end of file
+        return cls(cities)
@@ -1,4 +1,5 @@
-from ..problems.knapsack import KnapsackProblem
+import numpy as np
+from ..problems.knapsack import KnapsackProblem, FractionalBound
 from ..problems.tsp import TSPProblem
 from ..problems.graph_matching import GraphMatchingProblem
 
@@ -22,63 +23,112 @@ class BacktrackingSolver:
         """Backtracking solution for knapsack"""
         self.best_solution = []
         self.best_value = 0
-        self._backtrack_knapsack([], 0, 0)
+        if self.problem.capacity >= 0:
+            self._backtrack_knapsack()
         return self.best_solution
 
-    def _backtrack_knapsack(self, solution, index, current_weight):
-        if index >= len(self.problem.values):
-            value = sum(self.problem.values[i] for i in solution)
+    def _backtrack_knapsack(self):
+        """Depth-first search over items in density order, pruned by the fractional bound"""
+        values = self.problem.values
+        capacity = self.problem.capacity
+        # Items with no value never improve a packing
+        order = [i for i in self.problem.density_order() if values[i] > 0]
+        n = len(order)
+        w = [self.problem.weights[i] for i in order]
+        v = [values[i] for i in order]
+        bound = FractionalBound(w, v)
+
+        best_mask = 0
+        # Explicit stack of (level, weight, value, mask); bit k of mask = order[k] taken
+        stack = [(0, 0, 0, 0)]
+        while stack:
+            level, weight, value, mask = stack.pop()
             if value > self.best_value:
                 self.best_value = value
-                self.best_solution = solution[:]
-            return
-        # include
-        if current_weight + self.problem.weights[index] <= self.problem.capacity:
-            solution.append(index)
-            self._backtrack_knapsack(solution, index+1, current_weight + self.problem.weights[index])
-            solution.pop()
-        # exclude
-        self._backtrack_knapsack(solution, index+1, current_weight)
+                best_mask = mask
+            if level == n or value + bound(level, capacity - weight) <= self.best_value:
+                continue
+            # exclude (pushed first so the include branch is explored first)
+            stack.append((level + 1, weight, value, mask))
+            # include
+            if weight + w[level] <= capacity:
+                stack.append((level + 1, weight + w[level], value + v[level], mask | (1 << level)))
+
+        self.best_solution = sorted(order[k] for k in range(n) if best_mask >> k & 1)
     
     def _solve_tsp(self):
         """Backtracking solution for TSP"""
-        if self.problem.n > 10:  # Too expensive for large instances
-            from .greedy import GreedySolver
+        n = self.problem.n
+        if n <= 3:
+            return list(range(n))
+        from .greedy import GreedySolver
+        if n > 16:  # Too expensive for large instances
             return GreedySolver(self.problem).solve()
         
-        self.best_solution = []
-        self.best_distance = float('inf')
-        visited = [False] * self.problem.n
-        visited[0] = True
-        self._backtrack_tsp([0], visited, 0)
+        # Incumbent: the greedy tour
+        self.best_solution = GreedySolver(self.problem).solve()
+        self.best_distance = self.problem.evaluate(self.best_solution)
+        self._backtrack_tsp()
         return self.best_solution
     
-    def _backtrack_tsp(self, path, visited, current_distance):
-        if len(path) == self.problem.n:
-            # Complete tour by returning to start
-            total_distance = current_distance + self.problem.distance_matrix[path[-1]][path[0]]
-            if total_distance < self.best_distance:
-                self.best_distance = total_distance
-                self.best_solution = path[:]
-            return
+    def _backtrack_tsp(self):
+        """Depth-first search over tours from city 0, pruned by a two-cheapest-edges bound
+        
+        Each tour is enumerated in one direction only: the city after 0 must be
+        smaller than the city before it, so a path is dropped once every city
+        greater than its first step is used up.
+        """
+        n = self.problem.n
+        distance = np.asarray(self.problem.distance_matrix, dtype=np.float64)
+        cheapest, second = self.problem.cheapest_edges()
+        half = ((cheapest + second) / 2).tolist()
+        end_bound = ((cheapest + cheapest[0]) / 2).tolist()
+        # Children are tried nearest first
+        nearest = [[c for c in np.argsort(distance[city]).tolist() if c != 0 and c != city]
+                   for city in range(n)]
+        distance = distance.tolist()
+        full = (1 << n) - 1
         
-        current_city = path[-1]
-        for next_city in range(self.problem.n):
-            if not visited[next_city]:
-                new_distance = current_distance + self.problem.distance_matrix[current_city][next_city]
-                # Pruning: if current distance already exceeds best, skip
-                if new_distance < self.best_distance:
-                    visited[next_city] = True
-                    path.append(next_city)
-                    self._backtrack_tsp(path, visited, new_distance)
-                    path.pop()
-                    visited[next_city] = False
+        path = [0] * n
+        best_path = None
+        # Explicit stack of (depth, city, length, visited mask, unvisited half-sum, mask of cities after the first step)
+        stack = [(0, 0, 0.0, 1, sum(half[1:]), full)]
+        while stack:
+            depth, city, length, visited, rest, later = stack.pop()
+            path[depth] = city
+            if visited == full:
+                total_distance = length + distance[city][0]
+                if total_distance < self.best_distance:
+                    self.best_distance = total_distance
+                    best_path = path[:]
+                continue
+            if length + rest + end_bound[city] >= self.best_distance:
+                continue
+            
+            row = distance[city]
+            children = []
+            for next_city in nearest[city]:
+                if visited >> next_city & 1:
+                    continue
+                new_visited = visited | (1 << next_city)
+                new_later = later if depth else full & ~((2 << next_city) - 1)
+                # Some city after the first step must remain to close the tour
+                if new_visited != full and not new_later & ~new_visited:
+                    continue
+                new_length = length + row[next_city]
+                new_rest = rest - half[next_city]
+                if new_length + new_rest + end_bound[next_city] < self.best_distance:
+                    children.append((depth + 1, next_city, new_length, new_visited, new_rest, new_later))
+            stack.extend(reversed(children))
+        
+        if best_path is not None:
+            self.best_solution = best_path
     
     def _solve_matching(self):
         """Backtracking solution for matching"""
         if len(self.problem.edges) > 15:  # Too expensive for large instances
-            from .greedy import GreedySolver
-            return GreedySolver(self.problem).solve()
+            from .blossom import BlossomSolver
+            return BlossomSolver(self.problem).solve()
         
         self.best_solution = []
         self.best_weight = 0
@@ -0,0 +1,528 @@
+from array import array
+from collections import defaultdict
+import numpy as np
+from ..problems.graph_matching import GraphMatchingProblem
+
+
+def _max_weight_matching(n, edges):
+    """Edmonds' blossom algorithm for maximum weight matching on vertices 0..n-1
+
+    edges is a list of (u, v, weight) with u != v. Returns mate, where
+    mate[v] is the index of the edge matching v or -1. This is the primal-dual
+    O(n^3) method (Galil's formulation): alternating trees grow from all free
+    vertices over tight edges, odd cycles are shrunk into blossoms and the
+    dual variables are adjusted until an augmenting path appears. Unlike the
+    textbook version, only the two trees an augmentation passes through are
+    taken down afterwards; the rest of the forest keeps its labels.
+
+    Edge k has endpoints 2k (its first vertex) and 2k + 1 (its second);
+    p ^ 1 is the other end of endpoint p. Blossoms are numbered n..2n-1.
+    """
+    m = len(edges)
+    if m == 0:
+        return [-1] * n
+    max_weight = max(0, max(w for _, _, w in edges))
+    endpoint = [edges[p >> 1][p & 1] for p in range(2 * m)]
+    # Edge slack is dual[u] + dual[v] - 2 * weight
+    double_weight = [2 * w for _, _, w in edges]
+    # neighbour_ends[v]: endpoints on the far side of the edges at v
+    neighbour_ends = [[] for _ in range(n)]
+    for k, (u, v, _) in enumerate(edges):
+        neighbour_ends[u].append(2 * k + 1)
+        neighbour_ends[v].append(2 * k)
+
+    mate = [-1] * n  # remote endpoint of the matched edge
+    # label: 0 = free, 1 = S (outer), 2 = T (inner); 5 marks a scanned S-blossom
+    label = array('q', [0] * (2 * n))
+    label_end = [-1] * (2 * n)  # endpoint through which the label was assigned
+    in_blossom = array('q', range(n))  # top-level blossom containing each vertex
+    blossom_parent = array('q', [-1] * (2 * n))
+    blossom_children = [None] * (2 * n)
+    blossom_base = array('q', list(range(n)) + [-1] * n)
+    blossom_ends = [None] * (2 * n)  # endpoints linking consecutive children
+    best_edge = array('q', [-1] * (2 * n))  # least-slack edge to a different S-blossom
+    blossom_best_edges = [None] * (2 * n)
+    unused_blossoms = list(range(n, 2 * n))
+    dual = array('d', [max_weight] * n + [0] * n)
+    allowed = [False] * m  # edge is known to have zero slack
+    queue = []
+    # Arrays the dual update reads and writes in place
+    labels = np.frombuffer(label, dtype=np.int64)
+    tops = np.frombuffer(in_blossom, dtype=np.int64)
+    parents = np.frombuffer(blossom_parent, dtype=np.int64)
+    bases = np.frombuffer(blossom_base, dtype=np.int64)
+    best = np.frombuffer(best_edge, dtype=np.int64)
+    duals = np.frombuffer(dual, dtype=np.float64)
+    edge_u = np.array(endpoint[0::2])
+    edge_v = np.array(endpoint[1::2])
+    edge_double_weight = np.array(double_weight, dtype=np.float64)
+    tree = [-1] * (2 * n)  # root vertex of the alternating tree holding a labelled blossom
+    members = defaultdict(list)  # root -> blossoms labelled into its tree (may be stale)
+
+    def slack(k):
+        return dual[endpoint[2 * k]] + dual[endpoint[2 * k + 1]] - double_weight[k]
+
+    def leaves(b):
+        """Vertices inside blossom b"""
+        if b < n:
+            return [b]
+        found = []
+        stack = [b]
+        while stack:
+            c = stack.pop()
+            if c < n:
+                found.append(c)
+            else:
+                stack.extend(blossom_children[c])
+        return found
+
+    def assign_label(w, t, p):
+        """Label the top-level blossom of w with t, reached through endpoint p"""
+        b = in_blossom[w]
+        label[w] = label[b] = t
+        label_end[w] = label_end[b] = p
+        best_edge[w] = best_edge[b] = -1
+        tree[b] = w if p == -1 else tree[in_blossom[endpoint[p]]]
+        members[tree[b]].append(b)
+        if t == 1:
+            queue.extend(leaves(b))
+        else:
+            # the mate of a T-blossom's base becomes an S-vertex
+            base = blossom_base[b]
+            assign_label(endpoint[mate[base]], 1, mate[base] ^ 1)
+
+    def scan_blossom(v, w):
+        """Base of the new blossom through S-vertices v and w, or -1 for an augmenting path"""
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = in_blossom[v]
+            if label[b] & 4:
+                base = blossom_base[b]
+                break
+            path.append(b)
+            label[b] = 5
+            if label_end[b] == -1:
+                v = -1  # reached a tree root
+            else:
+                v = endpoint[label_end[b]]
+                b = in_blossom[v]
+                v = endpoint[label_end[b]]
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return base
+
+    def add_blossom(base, k):
+        """Shrink the odd cycle closed by edge k into a blossom with the given base"""
+        v, w, _ = edges[k]
+        bb = in_blossom[base]
+        bv = in_blossom[v]
+        bw = in_blossom[w]
+        b = unused_blossoms.pop()
+        blossom_base[b] = base
+        blossom_parent[b] = -1
+        blossom_parent[bb] = b
+        blossom_children[b] = path = []
+        blossom_ends[b] = ends = []
+        while bv != bb:
+            blossom_parent[bv] = b
+            path.append(bv)
+            ends.append(label_end[bv])
+            v = endpoint[label_end[bv]]
+            bv = in_blossom[v]
+        path.append(bb)
+        path.reverse()
+        ends.reverse()
+        ends.append(2 * k)
+        while bw != bb:
+            blossom_parent[bw] = b
+            path.append(bw)
+            ends.append(label_end[bw] ^ 1)
+            w = endpoint[label_end[bw]]
+            bw = in_blossom[w]
+        label[b] = 1
+        label_end[b] = label_end[bb]
+        tree[b] = tree[bb]
+        members[tree[b]].append(b)
+        dual[b] = 0
+        for v in leaves(b):
+            if label[in_blossom[v]] == 2:
+                queue.append(v)  # former T-vertices become S-vertices
+            in_blossom[v] = b
+
+        # least-slack edges from the new blossom to every other S-blossom
+        best_to = [-1] * (2 * n)
+        for bv in path:
+            if blossom_best_edges[bv] is None:
+                edge_lists = [[p >> 1 for p in neighbour_ends[v]] for v in leaves(bv)]
+            else:
+                edge_lists = [blossom_best_edges[bv]]
+            for edge_list in edge_lists:
+                for k in edge_list:
+                    i, j, _ = edges[k]
+                    if in_blossom[j] == b:
+                        i, j = j, i
+                    bj = in_blossom[j]
+                    if (bj != b and label[bj] == 1
+                            and (best_to[bj] == -1 or slack(k) < slack(best_to[bj]))):
+                        best_to[bj] = k
+            blossom_best_edges[bv] = None
+            best_edge[bv] = -1
+        blossom_best_edges[b] = [k for k in best_to if k != -1]
+        best_edge[b] = -1
+        for k in blossom_best_edges[b]:
+            if best_edge[b] == -1 or slack(k) < slack(best_edge[b]):
+                best_edge[b] = k
+
+    def expand_blossom(b, end_of_stage):
+        """Turn the children of blossom b back into top-level blossoms
+
+        At the end of a stage, sub-blossoms with zero dual are expanded too
+        (from an explicit stack, since nesting can be deep).
+        """
+        pending = [b]
+        while pending:
+            c = pending.pop()
+            for s in blossom_children[c]:
+                blossom_parent[s] = -1
+                if s < n:
+                    in_blossom[s] = s
+                elif end_of_stage and dual[s] == 0:
+                    pending.append(s)
+                else:
+                    for v in leaves(s):
+                        in_blossom[v] = s
+            if c != b:
+                free_blossom(c)
+
+        if not end_of_stage and label[b] == 2:
+            # Relabel the even-length path from the entry child to the base
+            entry_child = in_blossom[endpoint[label_end[b] ^ 1]]
+            j = blossom_children[b].index(entry_child)
+            if j & 1:
+                j -= len(blossom_children[b])
+                step = 1
+                flip = 0
+            else:
+                step = -1
+                flip = 1
+            p = label_end[b]
+            while j != 0:
+                label[endpoint[p ^ 1]] = 0
+                label[endpoint[blossom_ends[b][j - flip] ^ flip ^ 1]] = 0
+                assign_label(endpoint[p ^ 1], 2, p)
+                allowed[blossom_ends[b][j - flip] >> 1] = True
+                j += step
+                p = blossom_ends[b][j - flip] ^ flip
+                allowed[p >> 1] = True
+                j += step
+            bv = blossom_children[b][j]
+            label[endpoint[p ^ 1]] = label[bv] = 2
+            label_end[endpoint[p ^ 1]] = label_end[bv] = p
+            best_edge[bv] = -1
+            tree[bv] = tree[b]
+            members[tree[b]].append(bv)
+            j += step
+            # Children on the other side of the cycle may be reachable through T-vertices
+            while blossom_children[b][j] != entry_child:
+                bv = blossom_children[b][j]
+                if label[bv] == 1:
+                    j += step
+                    continue
+                for v in leaves(bv):
+                    if label[v] != 0:
+                        break
+                if label[v] != 0:
+                    label[v] = 0
+                    label[endpoint[mate[blossom_base[bv]]]] = 0
+                    assign_label(v, 2, label_end[v])
+                j += step
+        free_blossom(b)
+
+    def free_blossom(b):
+        """Return an expanded blossom's slot to the pool"""
+        label[b] = label_end[b] = -1
+        blossom_children[b] = blossom_ends[b] = None
+        blossom_base[b] = -1
+        blossom_best_edges[b] = None
+        best_edge[b] = -1
+        unused_blossoms.append(b)
+
+    def augment_steps(b, v):
+        """Swap matched and unmatched edges inside b so that v becomes its base
+
+        Yields (sub-blossom, vertex) for every sub-blossom that has to be
+        augmented first; augment_blossom runs those from an explicit stack,
+        since nested blossoms can be deeper than the recursion limit.
+        """
+        t = v
+        while blossom_parent[t] != b:
+            t = blossom_parent[t]
+        if t >= n:
+            yield t, v
+        i = j = blossom_children[b].index(t)
+        if i & 1:
+            j -= len(blossom_children[b])
+            step = 1
+            flip = 0
+        else:
+            step = -1
+            flip = 1
+        while j != 0:
+            j += step
+            t = blossom_children[b][j]
+            p = blossom_ends[b][j - flip] ^ flip
+            if t >= n:
+                yield t, endpoint[p]
+            j += step
+            t = blossom_children[b][j]
+            if t >= n:
+                yield t, endpoint[p ^ 1]
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+        blossom_children[b] = blossom_children[b][i:] + blossom_children[b][:i]
+        blossom_ends[b] = blossom_ends[b][i:] + blossom_ends[b][:i]
+        blossom_base[b] = blossom_base[blossom_children[b][0]]
+
+    def augment_blossom(b, v):
+        stack = [augment_steps(b, v)]
+        while stack:
+            inner = next(stack[-1], None)
+            if inner is None:
+                stack.pop()
+            else:
+                stack.append(augment_steps(*inner))
+
+    def augment_matching(k):
+        """Flip the augmenting path through edge k between two tree roots"""
+        v, w, _ = edges[k]
+        for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = in_blossom[s]
+                if bs >= n:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if label_end[bs] == -1:
+                    break  # reached the root
+                t = endpoint[label_end[bs]]
+                bt = in_blossom[t]
+                s = endpoint[label_end[bt]]
+                j = endpoint[label_end[bt] ^ 1]
+                if bt >= n:
+                    augment_blossom(bt, j)
+                mate[j] = label_end[bt]
+                p = label_end[bt] ^ 1
+
+    def dissolve_trees(roots):
+        """Unlabel the trees joined by an augmenting path; the rest of the forest stays
+
+        Labels, tight-edge flags and least-slack edges that refer to the
+        unlabelled vertices are reset, and the S-vertices next to them are
+        scanned again so that edges into the freed region are picked up.
+        """
+        dissolved = set()
+        for root in roots:
+            for b in members.pop(root, ()):
+                if (tree[b] == root and label[b] in (1, 2) and blossom_parent[b] == -1
+                        and (b < n or blossom_base[b] >= 0)):
+                    dissolved.add(b)
+        freed = []
+        zero_dual = []
+        for b in dissolved:
+            if label[b] == 1 and b >= n and dual[b] == 0:
+                zero_dual.append(b)
+            stack = [b]
+            while stack:
+                c = stack.pop()
+                label[c] = 0
+                label_end[c] = -1
+                best_edge[c] = -1
+                if c < n:
+                    freed.append(c)
+                else:
+                    blossom_best_edges[c] = None
+                    stack.extend(blossom_children[c])
+        # S-blossoms whose dual reached zero are not needed any more
+        for b in zero_dual:
+            expand_blossom(b, True)
+
+        rescan = set()
+        marked = []
+        stale_vertices = set()
+        stale_blossoms = set()
+        for x in freed:
+            for p in neighbour_ends[x]:
+                k = p >> 1
+                allowed[k] = False
+                y = endpoint[p]
+                by = in_blossom[y]
+                if label[by] == 1:
+                    rescan.add(y)
+                    if best_edge[by] == k:
+                        stale_blossoms.add(by)
+                else:
+                    if best_edge[y] == k:
+                        stale_vertices.add(y)
+                    if label[y] == 2 and endpoint[label_end[y]] == x:
+                        # y sits in a T-blossom and was only reachable through x
+                        label[y] = 0
+                        label_end[y] = -1
+                        marked.append(y)
+        for y in marked:
+            for p in neighbour_ends[y]:
+                if label[in_blossom[endpoint[p]]] == 1:
+                    rescan.add(endpoint[p])
+
+        for w in stale_vertices:
+            best = -1
+            for p in neighbour_ends[w]:
+                y = endpoint[p]
+                if label[in_blossom[y]] == 1 and in_blossom[y] != in_blossom[w]:
+                    k = p >> 1
+                    if best == -1 or slack(k) < slack(best):
+                        best = k
+            best_edge[w] = best
+        for b in stale_blossoms:
+            best = -1
+            for v in leaves(b):
+                for p in neighbour_ends[v]:
+                    bj = in_blossom[endpoint[p]]
+                    if bj != b and label[bj] == 1:
+                        k = p >> 1
+                        if best == -1 or slack(k) < slack(best):
+                            best = k
+            best_edge[b] = best
+            blossom_best_edges[b] = None
+        queue.extend(rescan)
+
+    # Grow alternating trees from every free vertex. After an augmentation
+    # only the two trees it went through are taken down, so the work spent on
+    # the rest of the forest is kept.
+    for v in range(n):
+        if mate[v] == -1 and label[in_blossom[v]] == 0:
+            assign_label(v, 1, -1)
+
+    while True:
+        while queue:
+            v = queue.pop()
+            bv = in_blossom[v]
+            if label[bv] != 1:
+                continue  # its tree was dissolved after it was queued
+            dual_v = dual[v]
+            for p in neighbour_ends[v]:
+                k = p >> 1
+                w = endpoint[p]
+                bw = in_blossom[w]
+                if bv == bw:
+                    continue
+                if not allowed[k]:
+                    k_slack = dual_v + dual[w] - double_weight[k]
+                    if k_slack <= 0:
+                        allowed[k] = True
+                if allowed[k]:
+                    if label[bw] == 0:
+                        assign_label(w, 2, p ^ 1)
+                    elif label[bw] == 1:
+                        base = scan_blossom(v, w)
+                        if base >= 0:
+                            add_blossom(base, k)
+                            bv = in_blossom[v]
+                        else:
+                            roots = (tree[bv], tree[bw])
+                            augment_matching(k)
+                            dissolve_trees(roots)
+                            break
+                    elif label[w] == 0:
+                        # w is inside a T-blossom but not yet reached itself
+                        label[w] = 2
+                        label_end[w] = p ^ 1
+                elif label[bw] == 1:
+                    if best_edge[bv] == -1 or k_slack < slack(best_edge[bv]):
+                        best_edge[bv] = k
+                elif label[w] == 0:
+                    if best_edge[w] == -1 or k_slack < slack(best_edge[w]):
+                        best_edge[w] = k
+
+        # No tight edge left: pick the largest dual change that keeps feasibility.
+        # This step touches every vertex and blossom, so it runs on array views.
+        vertex_label = labels[tops]
+        top_level = parents == -1
+        top_level[n:] &= bases[n:] >= 0
+
+        delta_type = 1
+        delta = duals[:n].min()
+        delta_edge = delta_blossom = -1
+        # an S-vertex reaches a free vertex
+        candidates = best[:n][(vertex_label == 0) & (best[:n] != -1)]
+        if len(candidates):
+            slacks = duals[edge_u[candidates]] + duals[edge_v[candidates]] - edge_double_weight[candidates]
+            i = int(np.argmin(slacks))
+            if slacks[i] < delta:
+                delta, delta_type, delta_edge = slacks[i], 2, int(candidates[i])
+        # two S-blossoms meet
+        candidates = best[top_level & (labels == 1) & (best != -1)]
+        if len(candidates):
+            slacks = (duals[edge_u[candidates]] + duals[edge_v[candidates]] - edge_double_weight[candidates]) / 2
+            i = int(np.argmin(slacks))
+            if slacks[i] < delta:
+                delta, delta_type, delta_edge = slacks[i], 3, int(candidates[i])
+        # a T-blossom's dual reaches zero
+        candidates = n + np.flatnonzero(top_level[n:] & (labels[n:] == 2))
+        if len(candidates):
+            i = int(np.argmin(duals[candidates]))
+            if duals[candidates[i]] < delta:
+                delta, delta_type, delta_blossom = duals[candidates[i]], 4, int(candidates[i])
+
+        duals[:n][vertex_label == 1] -= delta
+        duals[:n][vertex_label == 2] += delta
+        duals[n:][top_level[n:] & (labels[n:] == 1)] += delta
+        duals[n:][top_level[n:] & (labels[n:] == 2)] -= delta
+
+        if delta_type == 1:
+            break  # the free vertices reached dual 0: the matching is optimal
+        elif delta_type == 2:
+            allowed[delta_edge] = True
+            i, j, _ = edges[delta_edge]
+            if label[in_blossom[i]] == 0:
+                i = j
+            queue.append(i)
+        elif delta_type == 3:
+            allowed[delta_edge] = True
+            queue.append(edges[delta_edge][0])
+        else:
+            expand_blossom(delta_blossom, False)
+
+    return [p >> 1 if p >= 0 else -1 for p in mate]
+
+
+class BlossomSolver:
+    """Exact maximum weight matching for general graphs (Edmonds' blossom algorithm)"""
+
+    def __init__(self, problem):
+        self.problem = problem
+
+    def solve(self):
+        if isinstance(self.problem, GraphMatchingProblem):
+            return self._solve_matching()
+        else:
+            raise ValueError(f"Unsupported problem type: {type(self.problem)}")
+
+    def _solve_matching(self):
+        """Blossom algorithm over the edges that can improve a matching
+
+        Bipartite graphs small enough for a dense cost matrix go to the
+        Hungarian solver instead.
+        """
+        problem = self.problem
+        from .hungarian import HungarianSolver
+        if HungarianSolver.applies(problem):
+            return HungarianSolver(problem).solve()
+
+        # Loops and edges without positive weight never belong to an optimal matching
+        useful = np.flatnonzero((problem.u != problem.v) & (problem.w > 0))
+        edges = list(zip(problem.u[useful].tolist(), problem.v[useful].tolist(),
+                         problem.w[useful].tolist()))
+        mate = _max_weight_matching(problem.n_vertices, edges)
+        return sorted({int(useful[k]) for k in mate if k != -1})
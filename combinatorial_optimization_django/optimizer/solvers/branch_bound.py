@@ -1,5 +1,8 @@
+import bisect
 import heapq
-from ..problems.knapsack import KnapsackProblem
+import math
+import numpy as np
+from ..problems.knapsack import KnapsackProblem, FractionalBound
 from ..problems.tsp import TSPProblem
 from ..problems.graph_matching import GraphMatchingProblem
 
@@ -18,106 +21,233 @@ class BranchBoundSolver:
             raise ValueError(f"Unsupported problem type: {type(self.problem)}")
     
     def _solve_knapsack(self):
-        """Branch and bound solution for knapsack"""
-        n = len(self.problem.values)
-        queue = [([], 0, 0)]  # (solution, total_weight, total_value)
-        best_solution = []
-        best_value = 0
+        """Best-first branch and bound for knapsack with fractional upper bounds"""
+        weights = self.problem.weights
+        values = self.problem.values
+        capacity = self.problem.capacity
+        if capacity < 0:
+            return []
 
+        # Items with no value never improve a packing
+        order = [i for i in self.problem.density_order() if values[i] > 0]
+        n = len(order)
+        w = [weights[i] for i in order]
+        v = [values[i] for i in order]
+        bound = FractionalBound(w, v)
+
+        # Seed the incumbent with the greedy packing (bit k of a mask = order[k] taken)
+        greedy = set(self.problem.greedy_packing(order))
+        best_mask = sum(1 << k for k in range(n) if order[k] in greedy)
+        best_value = sum(values[i] for i in greedy)
+
+        # Node: (-upper_bound, -level, weight, value, mask)
+        queue = [(-bound(0, capacity), 0, 0, 0, 0)]
         while queue:
-            solution, weight, value = queue.pop(0)
-            if len(solution) == n:
-                if value > best_value:
-                    best_value = value
-                    best_solution = solution
+            neg_bound, neg_level, weight, value, mask = heapq.heappop(queue)
+            if -neg_bound <= best_value:
+                break  # no remaining node can beat the incumbent
+            level = -neg_level
+            if level == n:
                 continue
-            index = len(solution)
             # include
-            if weight + self.problem.weights[index] <= self.problem.capacity:
-                queue.append((solution+[index], weight+self.problem.weights[index], value+self.problem.values[index]))
+            new_weight = weight + w[level]
+            if new_weight <= capacity:
+                new_value = value + v[level]
+                new_mask = mask | (1 << level)
+                if new_value > best_value:
+                    best_value = new_value
+                    best_mask = new_mask
+                new_bound = new_value + bound(level + 1, capacity - new_weight)
+                if new_bound > best_value:
+                    heapq.heappush(queue, (-new_bound, neg_level - 1, new_weight, new_value, new_mask))
             # exclude
-            queue.append((solution+[None], weight, value))
+            new_bound = value + bound(level + 1, capacity - weight)
+            if new_bound > best_value:
+                heapq.heappush(queue, (-new_bound, neg_level - 1, weight, value, mask))
 
-        # Remove Nones from solution
-        return [i for i in best_solution if i is not None]
+        return sorted(order[k] for k in range(n) if best_mask >> k & 1)
     
     def _solve_tsp(self):
-        """Branch and bound solution for TSP"""
-        if self.problem.n > 12:  # Too expensive for large instances
-            from .greedy import GreedySolver
+        """Best-first branch and bound for TSP
+        
+        A path from city 0 to `last` is bounded by its length plus half of the
+        two cheapest edges at every unvisited city and of the cheapest edge at
+        each end of the path: the rest of the tour must use those edge slots.
+        """
+        n = self.problem.n
+        if n <= 3:
+            return list(range(n))
+        from .greedy import GreedySolver
+        if n > 14:  # Too expensive for large instances
             return GreedySolver(self.problem).solve()
         
-        # Use priority queue with lower bound estimation
-        # State: (lower_bound, path, visited_set)
-        queue = [(0, [0], {0})]
-        best_distance = float('inf')
-        best_tour = []
+        distance = np.asarray(self.problem.distance_matrix, dtype=np.float64).tolist()
+        cheapest, second = self.problem.cheapest_edges()
+        cheapest = cheapest.tolist()
+        half = ((cheapest + second) / 2).tolist()
+        
+        # Incumbent: the greedy tour
+        best_tour = GreedySolver(self.problem).solve()
+        best_distance = self.problem.evaluate(best_tour)
+        best_node = -1
+        
+        # Search tree as parent links: trail[k] = (parent index, city)
+        trail = [(-1, 0)]
+        full = (1 << n) - 1
+        rest = sum(half[1:])
+        # Node: (bound, -depth, length, last city, visited mask, unvisited half-sum, trail index)
+        queue = [(rest + cheapest[0], -1, 0.0, 0, 1, rest, 0)]
         
         while queue:
-            bound, path, visited = heapq.heappop(queue)
-            
+            bound, neg_depth, length, last, visited, rest, node = heapq.heappop(queue)
             if bound >= best_distance:
-                continue
-                
-            if len(path) == self.problem.n:
-                # Complete tour
-                total_distance = bound + self.problem.distance_matrix[path[-1]][path[0]]
-                if total_distance < best_distance:
-                    best_distance = total_distance
-                    best_tour = path[:]
-                continue
+                break  # no remaining node can beat the incumbent
             
-            current_city = path[-1]
-            for next_city in range(self.problem.n):
-                if next_city not in visited:
-                    new_path = path + [next_city]
-                    new_visited = visited | {next_city}
-                    new_bound = bound + self.problem.distance_matrix[current_city][next_city]
-                    
-                    # Add lower bound estimation (minimum outgoing edges from unvisited cities)
-                    if len(new_path) < self.problem.n:
-                        remaining = set(range(self.problem.n)) - new_visited
-                        for city in remaining:
-                            min_edge = min(self.problem.distance_matrix[city][j] 
-                                         for j in range(self.problem.n) if j != city)
-                            new_bound += min_edge * 0.5  # Rough estimation
-                    
-                    if new_bound < best_distance:
-                        heapq.heappush(queue, (new_bound, new_path, new_visited))
+            for city in range(1, n):
+                if visited >> city & 1:
+                    continue
+                new_length = length + distance[last][city]
+                new_visited = visited | (1 << city)
+                if new_visited == full:
+                    # Complete tour
+                    total_distance = new_length + distance[city][0]
+                    if total_distance < best_distance:
+                        best_distance = total_distance
+                        trail.append((node, city))
+                        best_node = len(trail) - 1
+                    continue
+                new_rest = rest - half[city]
+                new_bound = new_length + new_rest + (cheapest[0] + cheapest[city]) / 2
+                if new_bound < best_distance:
+                    trail.append((node, city))
+                    heapq.heappush(queue, (new_bound, neg_depth - 1, new_length, city,
+                                           new_visited, new_rest, len(trail) - 1))
         
-        return best_tour if best_tour else list(range(self.problem.n))
+        if best_node == -1:
+            return best_tour
+        tour = []
+        while best_node != -1:
+            best_node, city = trail[best_node]
+            tour.append(city)
+        tour.reverse()
+        return tour
     
     def _solve_matching(self):
-        """Branch and bound solution for matching"""
-        if len(self.problem.edges) > 15:  # Too expensive for large instances
-            from .greedy import GreedySolver
-            return GreedySolver(self.problem).solve()
+        """Branch and bound for matching, one connected component at a time"""
+        components = self.problem.components()
+        if len(components) <= 1:
+            return self._match_component(self.problem)
+        u, v, w = self.problem.u, self.problem.v, self.problem.w
+        solution = []
+        for component in components:
+            sub_problem = GraphMatchingProblem.from_arrays(u[component], v[component], w[component])
+            solution.extend(component[k] for k in self._match_component(sub_problem))
+        return sorted(solution)
+    
+    def _match_component(self, problem):
+        """Best-first branch and bound for matching
+        
+        Edges are decided heaviest first. A node is bounded by its weight plus
+        half the sum, over its free vertices, of the heaviest undecided edge
+        to another free vertex: every edge added later uses two of those
+        vertex slots and weighs no more than either. Excluding an edge whose
+        ends are both free means both must be matched later (to lighter
+        edges), otherwise taking the excluded edge instead is no worse.
+        """
+        u, v, w = problem.u, problem.v, problem.w
+        useful = np.flatnonzero((u != v) & (w > 0))
+        if len(useful) > 100:  # Too expensive for large instances
+            from .blossom import BlossomSolver
+            return BlossomSolver(problem).solve()
+        
+        # Position p in the search is edge order[p], heaviest first
+        order = useful[np.argsort(-w[useful], kind='stable')]
+        m = len(order)
+        ends_a = u[order].tolist()
+        ends_b = v[order].tolist()
+        weight = w[order].tolist()
+        # incident[x]: (positions, other ends) of the edges at x, in search order
+        incident = [([], []) for _ in range(problem.n_vertices)]
+        for p in range(m):
+            incident[ends_a[p]][0].append(p)
+            incident[ends_a[p]][1].append(ends_b[p])
+            incident[ends_b[p]][0].append(p)
+            incident[ends_b[p]][1].append(ends_a[p])
         
-        # Use priority queue with upper bound (negative weight for max-heap simulation)
-        # State: (-upper_bound, matching, used_vertices, edge_idx)
-        queue = [(0, [], set(), 0)]
+        def heaviest(x, p, used):
+            """Weight of the first edge at x from position p on whose other end is free"""
+            positions, others = incident[x]
+            for k in range(bisect.bisect_left(positions, p), len(positions)):
+                if not used >> others[k] & 1:
+                    return weight[positions[k]]
+            return 0
+        
+        # Incumbent: the greedy matching (bit p of a mask = edge order[p] taken)
         best_weight = 0
-        best_matching = []
+        best_edges = 0
+        used = 0
+        for p in range(m):
+            if not used >> ends_a[p] & 1 and not used >> ends_b[p] & 1:
+                used |= 1 << ends_a[p] | 1 << ends_b[p]
+                best_weight += weight[p]
+                best_edges |= 1 << p
+        best_node = -1
+        
+        # Search tree as parent links: trail[k] = (parent index, position taken)
+        trail = [(-1, -1)]
+        rest = sum(heaviest(x, 0, 0) for x in range(problem.n_vertices))
+        # Node: (-bound, -position, weight, used vertex mask, must-match vertex mask,
+        #        free-vertex sum, trail index)
+        queue = [(-rest / 2, 0, 0, 0, 0, rest, 0)]
         
         while queue:
-            neg_bound, matching, used_vertices, edge_idx = heapq.heappop(queue)
-            current_weight = -neg_bound
-            
-            if edge_idx >= len(self.problem.edges):
-                if current_weight > best_weight:
-                    best_weight = current_weight
-                    best_matching = matching[:]
+            neg_bound, neg_p, total, used, must, rest, node = heapq.heappop(queue)
+            if -neg_bound <= best_weight:
+                break  # no remaining node can beat the incumbent
+            # Skip edges that are already blocked; they appear in no bound term
+            p = -neg_p
+            while p < m and (used >> ends_a[p] & 1 or used >> ends_b[p] & 1):
+                p += 1
+            if p == m:
                 continue
+            a, b, wp = ends_a[p], ends_b[p], weight[p]
             
-            # Try including current edge
-            u, v, weight = self.problem.edges[edge_idx]
-            if u not in used_vertices and v not in used_vertices:
-                new_matching = matching + [edge_idx]
-                new_used = used_vertices | {u, v}
-                new_weight = current_weight + weight
-                heapq.heappush(queue, (-new_weight, new_matching, new_used, edge_idx + 1))
+            # include: a and b leave the sum, and so do the edges of their free neighbours into them
+            new_used = used | 1 << a | 1 << b
+            new_must = must & ~new_used
+            new_total = total + wp
+            new_rest = rest - 2 * wp
+            for y in set(incident[a][1] + incident[b][1]):
+                if not new_used >> y & 1:
+                    left = heaviest(y, p + 1, new_used)
+                    if not left and new_must >> y & 1:
+                        new_rest = -math.inf  # y can no longer be matched
+                        break
+                    new_rest += left - heaviest(y, p, used)
+            trail.append((node, p))
+            if new_total > best_weight:
+                best_weight = new_total
+                best_node = len(trail) - 1
+            new_bound = new_total + new_rest / 2
+            if new_bound > best_weight:
+                heapq.heappush(queue, (-new_bound, -p - 1, new_total, new_used, new_must,
+                                       new_rest, len(trail) - 1))
             
-            # Try excluding current edge
-            heapq.heappush(queue, (neg_bound, matching, used_vertices, edge_idx + 1))
+            # exclude: both a and b must be matched later, or adding edge p would
+            # improve the matching; edge p was the heaviest term at both
+            left_a = heaviest(a, p + 1, used)
+            left_b = heaviest(b, p + 1, used)
+            if left_a and left_b:
+                new_rest = rest - 2 * wp + left_a + left_b
+                new_bound = total + new_rest / 2
+                if new_bound > best_weight:
+                    heapq.heappush(queue, (-new_bound, -p - 1, total, used, must | 1 << a | 1 << b,
+                                           new_rest, node))
         
-        return best_matching
+        if best_node == -1:
+            return sorted(int(order[p]) for p in range(m) if best_edges >> p & 1)
+        matching = []
+        while best_node > 0:
+            best_node, p = trail[best_node]
+            matching.append(int(order[p]))
+        return sorted(matching)
@@ -1,7 +1,20 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 from ..problems.knapsack import KnapsackProblem
 from ..problems.tsp import TSPProblem
 from ..problems.graph_matching import GraphMatchingProblem
 
+# Largest region of the TSP decomposition that is solved directly
+TSP_LEAF_SIZE = 1000
+
+
+def _solve_region(coords):
+    """Greedy tour of one TSP region, as positions in coords (runs in a worker process)"""
+    from .greedy import GreedySolver
+    return GreedySolver(TSPProblem.from_coords(coords)).solve()
+
+
 class DivideConquerSolver:
     def __init__(self, problem):
         self.problem = problem
@@ -17,93 +30,131 @@ class DivideConquerSolver:
             raise ValueError(f"Unsupported problem type: {type(self.problem)}")
     
     def _solve_knapsack(self):
-        """Divide and conquer for knapsack (simplified approach)"""
+        """Divide and conquer for knapsack (Horowitz-Sahni meet in the middle)"""
         n = len(self.problem.values)
-        if n == 0:
+        capacity = self.problem.capacity
+        if capacity < 0:
             return []
-        if n == 1:
-            return [0] if self.problem.weights[0] <= self.problem.capacity else []
+        if n > 44:  # 2^22 subsets per half is the practical limit
+            from .greedy import GreedySolver
+            return GreedySolver(self.problem).solve()
         
         # Divide items into two halves
         mid = n // 2
-        left_items = list(range(mid))
-        right_items = list(range(mid, n))
+        left_weights, left_values = self._subset_sums(range(mid))
+        right_weights, right_values = self._subset_sums(range(mid, n))
         
-        # Generate all possible combinations for each half
-        left_combinations = self._generate_combinations(left_items)
-        right_combinations = self._generate_combinations(right_items)
+        # Reduce the right half to its Pareto frontier: sorted by weight with
+        # strictly increasing value, so the best fit is the last affordable entry
+        order = np.lexsort((-right_values, right_weights))
+        sorted_values = right_values[order]
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = sorted_values[1:] > np.maximum.accumulate(sorted_values)[:-1]
+        frontier = order[keep]
+        frontier_weights = right_weights[frontier]
+        frontier_values = right_values[frontier]
         
-        # Find best combination
-        best_value = 0
-        best_solution = []
+        # Binary search the frontier for every left subset that fits
+        fits = np.flatnonzero(left_weights <= capacity)
+        match = np.searchsorted(frontier_weights, capacity - left_weights[fits], side='right') - 1
+        totals = left_values[fits] + frontier_values[match]
+        best = int(np.argmax(totals))
+        left_mask = int(fits[best])
+        right_mask = int(frontier[match[best]])
         
-        for left_combo in left_combinations:
-            left_weight = sum(self.problem.weights[i] for i in left_combo)
-            left_value = sum(self.problem.values[i] for i in left_combo)
-            remaining_capacity = self.problem.capacity - left_weight
-            
-            if remaining_capacity >= 0:
-                # Find best right combination that fits
-                best_right = []
-                best_right_value = 0
-                
-                for right_combo in right_combinations:
-                    right_weight = sum(self.problem.weights[i] for i in right_combo)
-                    right_value = sum(self.problem.values[i] for i in right_combo)
-                    
-                    if right_weight <= remaining_capacity and right_value > best_right_value:
-                        best_right = right_combo
-                        best_right_value = right_value
-                
-                total_value = left_value + best_right_value
-                if total_value > best_value:
-                    best_value = total_value
-                    best_solution = left_combo + best_right
-        
-        return best_solution
+        solution = [i for i in range(mid) if left_mask >> i & 1]
+        solution += [mid + i for i in range(n - mid) if right_mask >> i & 1]
+        return solution
     
-    def _generate_combinations(self, items):
-        """Generate all possible combinations of items"""
-        if not items:
-            return [[]]
-        
-        combinations = []
-        first = items[0]
-        rest = items[1:]
-        
-        # Combinations without first item
-        for combo in self._generate_combinations(rest):
-            combinations.append(combo)
-        
-        # Combinations with first item
-        for combo in self._generate_combinations(rest):
-            combinations.append([first] + combo)
-        
-        return combinations
+    def _subset_sums(self, items):
+        """Weight and value of every subset of items; position k encodes the subset bitmask k"""
+        weights = np.zeros(1, dtype=np.asarray(self.problem.weights).dtype)
+        values = np.zeros(1, dtype=np.asarray(self.problem.values).dtype)
+        for i in items:
+            weights = np.concatenate((weights, weights + self.problem.weights[i]))
+            values = np.concatenate((values, values + self.problem.values[i]))
+        return weights, values
     
     def _solve_tsp(self):
-        """Divide and conquer for TSP (simplified - uses nearest neighbor)"""
-        # For TSP, divide and conquer is complex, so we use a heuristic approach
-        if self.problem.n <= 1:
-            return list(range(self.problem.n))
+        """Divide and conquer for TSP: k-d partition, parallel region tours, stitching
         
-        # Divide cities into clusters and solve each cluster
-        if self.problem.n <= 6:
+        Cities are split at the median of the wider side until every region
+        holds at most TSP_LEAF_SIZE cities. Region tours are built in a process
+        pool and visited in the order of a tour through the region centroids;
+        each one is cut open next to where the previous region was left, and
+        local search then repairs the seams.
+        """
+        n = self.problem.n
+        if n <= 1:
+            return list(range(n))
+        if n <= 6:
             # Small instance - use brute force
             from .backtracking import BacktrackingSolver
             return BacktrackingSolver(self.problem).solve()
-        else:
-            # Large instance - use greedy
-            from .greedy import GreedySolver
+        from .greedy import GreedySolver
+        if n <= TSP_LEAF_SIZE:
             return GreedySolver(self.problem).solve()
+        
+        coords = self.problem.coords
+        regions = self._partition(np.arange(n), coords)
+        region_coords = [coords[ids] for ids in regions]
+        workers = min(len(regions), os.cpu_count() or 1)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunk = max(1, len(regions) // (4 * workers))
+                region_tours = list(pool.map(_solve_region, region_coords, chunksize=chunk))
+        else:
+            region_tours = [_solve_region(points) for points in region_coords]
+        
+        centroids = np.array([points.mean(axis=0) for points in region_coords])
+        order = GreedySolver(TSPProblem.from_coords(centroids)).solve()
+        
+        tour = []
+        seams = []
+        exit_point = centroids[order[-1]]
+        for k, region in enumerate(order):
+            cycle = regions[region][region_tours[region]]
+            points = coords[cycle]
+            # Enter at the city closest to where the previous region was left
+            entry = int(np.argmin(np.hypot(*(points - exit_point).T)))
+            forward = np.roll(cycle, -entry)
+            backward = np.roll(cycle[::-1], entry + 1 - len(cycle))
+            # Leave through whichever neighbour of the entry is closer to the next region
+            target = centroids[order[(k + 1) % len(order)]]
+            if np.hypot(*(coords[backward[-1]] - target)) < np.hypot(*(coords[forward[-1]] - target)):
+                forward = backward
+            tour.extend(forward.tolist())
+            seams.extend((int(forward[0]), int(forward[-1])))
+            exit_point = coords[forward[-1]]
+        
+        start = tour.index(0)
+        tour = tour[start:] + tour[:start]
+        from .local_search import TourImprover
+        return TourImprover(self.problem).improve(tour, active=seams)
+    
+    @staticmethod
+    def _partition(ids, coords):
+        """Split city ids at the median of the wider side into regions of at most TSP_LEAF_SIZE"""
+        if len(ids) <= TSP_LEAF_SIZE:
+            return [ids]
+        points = coords[ids]
+        axis = int(np.ptp(points[:, 1]) > np.ptp(points[:, 0]))
+        half = len(ids) // 2
+        split = np.argpartition(points[:, axis], half)
+        return (DivideConquerSolver._partition(ids[split[:half]], coords)
+                + DivideConquerSolver._partition(ids[split[half:]], coords))
     
     def _solve_matching(self):
-        """Divide and conquer for matching"""
+        """Divide and conquer for matching: connected components are matched independently"""
         if len(self.problem.edges) <= 10:
             # Small instance - use exact algorithm
             from .backtracking import BacktrackingSolver
             return BacktrackingSolver(self.problem).solve()
-        else:
-            # Large instance - use greedy
-            from .greedy import GreedySolver
-            return GreedySolver(self.problem).solve()
+        
+        from .blossom import BlossomSolver
+        solution = []
+        for component in self.problem.components():
+            sub_problem = GraphMatchingProblem.from_arrays(
+                self.problem.u[component], self.problem.v[component], self.problem.w[component])
+            solution.extend(component[k] for k in BlossomSolver(sub_problem).solve())
+        return sorted(solution)
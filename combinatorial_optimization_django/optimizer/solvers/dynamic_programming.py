@@ -1,13 +1,41 @@
-from ..problems.knapsack import KnapsackProblem
+import math
+from functools import reduce
+import numpy as np
+from ..problems.knapsack import KnapsackProblem, FractionalBound
 from ..problems.tsp import TSPProblem
 from ..problems.graph_matching import GraphMatchingProblem
 
+# Memory allowed for the Held-Karp tables
+HELD_KARP_MEMORY_BYTES = 512 * 1024 * 1024
+
+# Memory allowed for the decision bits of the approximate knapsack DP
+FPTAS_MEMORY_BYTES = 512 * 1024 * 1024
+
+# Largest vertex count for the bitmask matching DP (a 2^n table)
+MATCHING_DP_MAX_VERTICES = 24
+
+
+def _is_integral(numbers):
+    """True when every number is a whole number"""
+    return all(float(x).is_integer() for x in numbers)
+
+
+def _gcd(numbers):
+    """Greatest common divisor of whole numbers (1 when all are zero)"""
+    return reduce(math.gcd, (int(x) for x in numbers), 0) or 1
+
+
 class DPSolver:
-    def __init__(self, problem):
+    def __init__(self, problem, epsilon=None):
         self.problem = problem
+        # Knapsack only: with epsilon set, return a (1 - epsilon)-optimal packing (FPTAS)
+        self.epsilon = epsilon
+        self.upper_bound = None
 
     def solve(self):
         if isinstance(self.problem, KnapsackProblem):
+            if self.epsilon:
+                return self._approximate_knapsack()
             return self._solve_knapsack()
         elif isinstance(self.problem, TSPProblem):
             return self._solve_tsp()
@@ -17,101 +45,288 @@ class DPSolver:
             raise ValueError(f"Unsupported problem type: {type(self.problem)}")
     
     def _solve_knapsack(self):
-        """Dynamic programming solution for knapsack"""
-        n = len(self.problem.values)
-        W = self.problem.capacity
-        dp = [[0]*(W+1) for _ in range(n+1)]
-
-        for i in range(1, n+1):
-            for w in range(W+1):
-                if self.problem.weights[i-1] <= w:
-                    dp[i][w] = max(dp[i-1][w],
-                                   dp[i-1][w-self.problem.weights[i-1]] + self.problem.values[i-1])
-                else:
-                    dp[i][w] = dp[i-1][w]
+        """Dynamic programming solution for knapsack
+        
+        Runs the DP over capacity or over total value, whichever table is smaller.
+        """
+        weights = self.problem.weights
+        values = self.problem.values
+        capacity = self.problem.capacity
+        if capacity < 0:
+            return []
+        n = len(values)
+        
+        # Weight-indexed table: weights and capacity divided by their GCD, and
+        # capacity capped at the total weight of the items that fit
+        weight_cells = None
+        if _is_integral(weights):
+            g = _gcd(weights)
+            scaled_weights = [int(w) // g for w in weights]
+            scaled_capacity = int(capacity) // g
+            scaled_capacity = min(scaled_capacity, sum(w for w in scaled_weights if w <= scaled_capacity))
+            weight_cells = n * (scaled_capacity + 1)
+        
+        # Value-indexed table: useful values divided by their GCD
+        value_cells = None
+        if _is_integral(values):
+            useful = [v for w, v in zip(weights, values) if w <= capacity and v > 0]
+            g = _gcd(useful)
+            scaled_values = [int(v) // g if v > 0 else 0 for v in values]
+            value_cells = n * (sum(useful) // g + 1)
+        
+        if weight_cells is not None and (value_cells is None or weight_cells <= value_cells):
+            return self._knapsack_by_weight(scaled_weights, values, scaled_capacity)
+        if value_cells is not None:
+            return self._knapsack_by_value(weights, scaled_values, capacity)
+        raise ValueError("Dynamic programming needs integer weights or integer values")
+    
+    def _approximate_knapsack(self):
+        """FPTAS for knapsack: value-indexed DP over values scaled down by K
+        
+        Rounding loses less than K per packed item, and K is chosen so that the
+        loss is at most epsilon times a lower bound on the optimum. The DP keeps
+        n x (upper / K + 1) decision bits; when that exceeds FPTAS_MEMORY_BYTES,
+        K is raised until it fits, which loosens the guarantee (upper_bound
+        always reports the one actually achieved). The greedy packing is
+        returned instead when it is worth more than the DP's.
+        """
+        weights = self.problem.weights
+        values = self.problem.values
+        capacity = self.problem.capacity
+        self.upper_bound = 0
+        if capacity < 0:
+            return []
+        order = [i for i in self.problem.density_order() if weights[i] <= capacity and values[i] > 0]
+        if not order:
+            return []
+        
+        # Lower bound: best of the greedy packing and the most valuable single item
+        greedy = self.problem.greedy_packing(order)
+        best_item = max(order, key=lambda i: values[i])
+        if sum(values[i] for i in greedy) < values[best_item]:
+            greedy = [best_item]
+        lower = sum(values[i] for i in greedy)
+        upper = FractionalBound([weights[i] for i in order], [values[i] for i in order])(0, capacity)
+        
+        # No packing holds more than the m lightest items
+        m = 0
+        total_weight = 0
+        for w in sorted(weights[i] for i in order):
+            if total_weight + w > capacity:
+                break
+            total_weight += w
+            m += 1
+        
+        K = self.epsilon * lower / m
+        exact = K <= 1 and _is_integral(values)
+        if exact:
+            K = 1  # the unscaled table is already this small
+        n = len(values)
+        columns = FPTAS_MEMORY_BYTES * 8 // n  # value columns that fit the budget
+        if columns < 2:
+            self.upper_bound = upper
+            return sorted(greedy)
+        if upper / K + 2 > columns:
+            K = upper / (columns - 2)
+            exact = False
+        scaled_values = [int(v // K) if v > 0 else 0 for v in values]
+        solution = self._knapsack_by_value(weights, scaled_values, capacity, limit=int(upper // K) + 1)
+        
+        value = sum(values[i] for i in solution)
+        bound = value if exact else min(upper, value + m * K)
+        if value < lower:
+            solution, value = sorted(greedy), lower
+        self.upper_bound = max(bound, value)
+        return solution
+    
+    def _knapsack_by_weight(self, weights, values, capacity):
+        """DP over capacity: best value reachable within each capacity"""
+        n = len(values)
+        W = capacity
+        values = np.asarray(values)
+        dtype = np.float64 if values.dtype.kind == 'f' else np.int64
+
+        # Rolling row: dp[w] = best value within capacity w using the items seen so far
+        dp = np.zeros(W + 1, dtype=dtype)
+        # Packed decision bits: bit w of take[i] is set when item i improved dp[w]
+        take = np.zeros((n, (W + 8) // 8), dtype=np.uint8)
+        improved = np.zeros(W + 1, dtype=bool)
+
+        for i in range(n):
+            w = weights[i]
+            if w > W:
+                continue
+            candidate = dp[:W + 1 - w] + values[i]
+            improved[:w] = False
+            np.greater(candidate, dp[w:], out=improved[w:])
+            np.maximum(dp[w:], candidate, out=dp[w:])
+            take[i] = np.packbits(improved)
 
         # reconstruct solution
         solution = []
         w = W
-        for i in range(n, 0, -1):
-            if dp[i][w] != dp[i-1][w]:
-                solution.append(i-1)
-                w -= self.problem.weights[i-1]
+        for i in range(n - 1, -1, -1):
+            if take[i, w >> 3] & (0x80 >> (w & 7)):
+                solution.append(i)
+                w -= weights[i]
+        return solution
+    
+    def _knapsack_by_value(self, weights, values, capacity, limit=None):
+        """DP over total value: minimum weight needed to reach each value
+        
+        limit, when given, must be at least the value of any feasible packing.
+        """
+        n = len(values)
+        items = [i for i in range(n) if weights[i] <= capacity and values[i] > 0]
+        V = sum(values[i] for i in items)
+        if limit is not None:
+            V = min(V, limit)
+
+        # Weights above capacity are never useful, so capacity + 1 acts as infinity
+        if _is_integral(weights):
+            dp = np.full(V + 1, int(capacity) + 1, dtype=np.int64)
+        else:
+            dp = np.full(V + 1, np.inf)
+        dp[0] = 0
+        # Packed decision bits: bit v of take[i] is set when item i improved dp[v]
+        take = np.zeros((n, (V + 8) // 8), dtype=np.uint8)
+        improved = np.zeros(V + 1, dtype=bool)
+
+        for i in items:
+            v = values[i]
+            if v > V:
+                continue
+            candidate = dp[:V + 1 - v] + weights[i]
+            improved[:v] = False
+            np.less(candidate, dp[v:], out=improved[v:])
+            np.minimum(dp[v:], candidate, out=dp[v:])
+            take[i] = np.packbits(improved)
+
+        # best reachable value, then reconstruct solution
+        v = int(np.flatnonzero(dp <= capacity)[-1])
+        solution = []
+        for i in range(n - 1, -1, -1):
+            if take[i, v >> 3] & (0x80 >> (v & 7)):
+                solution.append(i)
+                v -= values[i]
         return solution
     
     def _solve_tsp(self):
-        """Dynamic programming solution for TSP (Held-Karp algorithm)"""
+        """Dynamic programming solution for TSP (Held-Karp algorithm)
+        
+        City 0 is the fixed start and bit j of a mask stands for city j + 1;
+        dp[mask, j] is the shortest path from city 0 through the cities in mask
+        that ends at city j + 1.
+        """
         n = self.problem.n
         if n <= 1:
             return list(range(n))
-        if n > 15:  # Too expensive for large instances
+        m = n - 1
+        if (1 << m) * m * 9 > HELD_KARP_MEMORY_BYTES:  # float64 costs + int8 parents
             from .greedy import GreedySolver
             return GreedySolver(self.problem).solve()
         
-        # dp[mask][i] = minimum cost to visit all cities in mask ending at city i
-        dp = {}
-        parent = {}
+        distance = np.asarray(self.problem.distance_matrix, dtype=np.float64)
+        between = distance[1:, 1:]
+        dp = np.full((1 << m, m), np.inf)
+        parent = np.full((1 << m, m), -1, dtype=np.int8)
+        for j in range(m):
+            dp[1 << j, j] = distance[0, j + 1]
         
-        # Initialize: start from city 0
-        for i in range(1, n):
-            dp[(1 << i) | 1, i] = self.problem.distance_matrix[0][i]
-            parent[(1 << i) | 1, i] = 0
+        # Process masks in layers of equal popcount so every predecessor is final
+        masks = np.arange(1 << m)
+        popcount = np.zeros(1 << m, dtype=np.int8)
+        for j in range(m):
+            popcount += (masks >> j) & 1
+        layers = np.argsort(popcount, kind='stable')
+        starts = np.searchsorted(popcount[layers], np.arange(m + 2))
         
-        # Fill DP table
-        for mask in range(1, 1 << n):
-            if not (mask & 1):  # Must include city 0
-                continue
-            for u in range(n):
-                if not (mask & (1 << u)):
-                    continue
-                for v in range(n):
-                    if u == v or not (mask & (1 << v)):
-                        continue
-                    prev_mask = mask ^ (1 << u)
-                    if (prev_mask, v) in dp:
-                        cost = dp[prev_mask, v] + self.problem.distance_matrix[v][u]
-                        if (mask, u) not in dp or cost < dp[mask, u]:
-                            dp[mask, u] = cost
-                            parent[mask, u] = v
-        
-        # Find minimum cost tour
-        final_mask = (1 << n) - 1
-        min_cost = float('inf')
-        last_city = -1
-        
-        for i in range(1, n):
-            if (final_mask, i) in dp:
-                cost = dp[final_mask, i] + self.problem.distance_matrix[i][0]
-                if cost < min_cost:
-                    min_cost = cost
-                    last_city = i
-        
-        # Reconstruct path
-        if last_city == -1:
-            return list(range(n))
+        for size in range(2, m + 1):
+            layer = layers[starts[size]:starts[size + 1]]
+            for u in range(m):
+                ending = layer[(layer >> u) & 1 == 1]
+                # cost[k, v] = dp[ending[k] without u, v] + distance from v to u
+                cost = dp[ending ^ (1 << u)] + between[:, u]
+                best = np.argmin(cost, axis=1)
+                dp[ending, u] = cost[np.arange(len(ending)), best]
+                parent[ending, u] = best
         
+        # Close the tour back to city 0 and reconstruct path
+        full = (1 << m) - 1
+        last = int(np.argmin(dp[full] + distance[1:, 0]))
         path = []
-        mask = final_mask
-        curr = last_city
-        
-        while curr != -1:
-            path.append(curr)
-            if (mask, curr) not in parent:
-                break
-            next_curr = parent[mask, curr]
-            mask ^= (1 << curr)
-            curr = next_curr
+        mask = full
+        while last != -1:
+            path.append(last + 1)
+            previous = int(parent[mask, last])
+            mask ^= 1 << last
+            last = previous
         
+        path.append(0)
         path.reverse()
         return path
     
     def _solve_matching(self):
-        """DP solution for matching (simplified - uses greedy for complex cases)"""
-        # For small instances, we can use bitmask DP
-        if len(self.problem.edges) > 20:
-            from .greedy import GreedySolver
-            return GreedySolver(self.problem).solve()
+        """Bitmask DP for maximum weight matching over small vertex sets
+        
+        best[mask] is the heaviest matching inside the vertex set mask. The
+        lowest vertex i of mask is either left unmatched or matched to some
+        neighbour j, so best[mask] only depends on masks whose lowest vertex
+        is above i. Masks are filled in blocks of equal lowest vertex, from
+        the highest down; each block is a strided slice of the table.
+        """
+        problem = self.problem
+        u, v, w = problem.u, problem.v, problem.w
+        useful = np.flatnonzero((u != v) & (w > 0))
+        vertices = np.unique(np.concatenate((u[useful], v[useful])))
+        n = len(vertices)
+        if n > MATCHING_DP_MAX_VERTICES:
+            from .blossom import BlossomSolver
+            return BlossomSolver(problem).solve()
+        if n == 0:
+            return []
+        
+        # Heaviest edge between each pair of vertices, keyed by (lower, higher) local id
+        local = np.searchsorted(vertices, np.concatenate((u[useful], v[useful])))
+        ends_a = local[:len(useful)].tolist()
+        ends_b = local[len(useful):].tolist()
+        weights = w[useful].tolist()
+        pair_edge = {}
+        for k, (a, b) in enumerate(zip(ends_a, ends_b)):
+            key = (a, b) if a < b else (b, a)
+            if key not in pair_edge or weights[k] > weights[pair_edge[key]]:
+                pair_edge[key] = k
+        neighbors = [[] for _ in range(n)]
+        for (a, b), k in pair_edge.items():
+            neighbors[a].append((b, weights[k], k))
+        
+        dtype = np.int64 if w.dtype.kind in 'iu' else np.float64
+        best = np.zeros(1 << n, dtype=dtype)
+        for i in range(n - 1, -1, -1):
+            step = 1 << (i + 1)
+            # r-th mask with lowest vertex i is (r << (i + 1)) | (1 << i)
+            without_i = best[::step]  # best[r << (i + 1)]
+            block = without_i.copy()
+            for j, weight, _ in neighbors[i]:
+                # split r on bit j - i - 1: with_j[x, y] has it set, without_j[x, y] does not
+                low = 1 << (j - i - 1)
+                shape = (len(block) // (2 * low), 2, low)
+                without_j = without_i.reshape(shape)[:, 0, :]
+                with_j = block.reshape(shape)[:, 1, :]
+                np.maximum(with_j, without_j + weight, out=with_j)
+            best[1 << i::step] = block
         
-        # Use greedy approach for matching as DP is complex for general matching
-        from .greedy import GreedySolver
-        return GreedySolver(self.problem).solve()
+        # Reconstruct by repeating the choice made at each lowest vertex
+        matching = []
+        mask = (1 << n) - 1
+        while mask:
+            i = (mask & -mask).bit_length() - 1
+            rest = mask ^ (1 << i)
+            if best[mask] != best[rest]:
+                for j, weight, k in neighbors[i]:
+                    if rest >> j & 1 and best[rest ^ (1 << j)] + weight == best[mask]:
+                        matching.append(int(useful[k]))
+                        rest ^= 1 << j
+                        break
+            mask = rest
+        return sorted(matching)
@@ -1,10 +1,19 @@
+import numpy as np
 from ..problems.knapsack import KnapsackProblem
 from ..problems.tsp import TSPProblem
 from ..problems.graph_matching import GraphMatchingProblem
+from ..spatial import GridIndex
+from .local_search import TourImprover, MatchingImprover
+
+# Largest TSP instance whose greedy tour is refined by 2-opt/Or-opt by default;
+# the refinement grows faster than linearly, construction stays near-linear
+TOUR_IMPROVE_MAX_CITIES = 10000
 
 class GreedySolver:
-    def __init__(self, problem):
+    def __init__(self, problem, improve=None):
         self.problem = problem
+        # TSP only: refine the tour with TourImprover (default: up to TOUR_IMPROVE_MAX_CITIES)
+        self.improve = improve
 
     def solve(self):
         if isinstance(self.problem, KnapsackProblem):
@@ -18,47 +27,58 @@ class GreedySolver:
     
     def _solve_knapsack(self):
         """Greedy solution for knapsack: sort by value/weight ratio"""
-        items = list(range(len(self.problem.values)))
-        items.sort(key=lambda i: self.problem.values[i]/self.problem.weights[i], reverse=True)
-        solution = []
-        total_weight = 0
-        for i in items:
-            if total_weight + self.problem.weights[i] <= self.problem.capacity:
-                solution.append(i)
-                total_weight += self.problem.weights[i]
-        return solution
+        return self.problem.greedy_packing()
     
     def _solve_tsp(self):
-        """Greedy solution for TSP: nearest neighbor heuristic"""
+        """Greedy solution for TSP: nearest neighbor heuristic, then 2-opt/Or-opt
+        
+        Unvisited cities live in a GridIndex, so each step is a local grid
+        search rather than a scan of every unvisited city. The 2-opt/Or-opt
+        pass only runs on instances of up to TOUR_IMPROVE_MAX_CITIES cities
+        unless improve says otherwise.
+        """
         if self.problem.n <= 1:
             return list(range(self.problem.n))
         
-        unvisited = set(range(1, self.problem.n))
+        unvisited = GridIndex(self.problem.coords)
+        unvisited.remove(0)
         tour = [0]  # Start from city 0
         current = 0
         
-        while unvisited:
-            nearest = min(unvisited, key=lambda city: self.problem.distance_matrix[current][city])
-            tour.append(nearest)
-            unvisited.remove(nearest)
-            current = nearest
+        while len(unvisited):
+            x, y = self.problem.cities[current]
+            current = unvisited.nearest(x, y)
+            tour.append(current)
+            unvisited.remove(current)
         
-        return tour
+        improve = self.improve
+        if improve is None:
+            improve = self.problem.n <= TOUR_IMPROVE_MAX_CITIES
+        if not improve:
+            return tour
+        return TourImprover(self.problem).improve(tour)
     
     def _solve_matching(self):
-        """Greedy solution for matching: sort edges by weight, add if valid"""
-        # Sort edges by weight (descending)
-        edge_indices = list(range(len(self.problem.edges)))
-        edge_indices.sort(key=lambda i: self.problem.edges[i][2], reverse=True)
+        """Greedy solution for matching: heaviest edges first, then local search
+        
+        The greedy matching is refined by MatchingImprover, which applies
+        weight-increasing swaps of up to three edges.
+        """
+        # Sort edges by weight (descending); edges without positive weight never help
+        edge_indices = np.argsort(-self.problem.w, kind='stable').tolist()
+        edge_indices = edge_indices[:int(np.count_nonzero(self.problem.w > 0))]
+        ends_u = self.problem.u.tolist()
+        ends_v = self.problem.v.tolist()
         
         matching = []
-        used_vertices = set()
+        used_vertices = bytearray(self.problem.n_vertices)
         
         for edge_idx in edge_indices:
-            u, v, _ = self.problem.edges[edge_idx]
-            if u not in used_vertices and v not in used_vertices:
+            u = ends_u[edge_idx]
+            v = ends_v[edge_idx]
+            if u != v and not used_vertices[u] and not used_vertices[v]:
                 matching.append(edge_idx)
-                used_vertices.add(u)
-                used_vertices.add(v)
+                used_vertices[u] = 1
+                used_vertices[v] = 1
         
-        return matching
+        return MatchingImprover(self.problem).improve(matching)
@@ -0,0 +1,144 @@
+import numpy as np
+from ..problems.graph_matching import GraphMatchingProblem
+
+# Largest cost matrix (left side x right side) the Hungarian solver builds
+HUNGARIAN_MAX_CELLS = 3000 * 3000
+
+
+def _assignment(cost):
+    """Column assigned to each row in a minimum-cost assignment (rows <= columns)
+
+    Shortest augmenting path form of the Hungarian algorithm (Jonker-Volgenant
+    style): rows are first given their cheapest column where it is still free,
+    then every other row is inserted by a Dijkstra search over the reduced
+    costs, one NumPy pass over the unscanned columns per step. Potentials are
+    only updated once per search.
+    """
+    n, m = cost.shape
+    u = np.zeros(n)
+    v = np.zeros(m)
+    row4col = np.full(m, -1, dtype=np.int64)
+    col4row = np.full(n, -1, dtype=np.int64)
+
+    # Row reduction; keeps every column potential at 0, as unassigned columns need
+    cheapest = np.argmin(cost, axis=1)
+    u[:] = cost[np.arange(n), cheapest]
+    free_rows = []
+    for i, j in enumerate(cheapest.tolist()):
+        if row4col[j] == -1:
+            row4col[j] = i
+            col4row[i] = j
+        else:
+            free_rows.append(i)
+
+    columns = np.arange(m)
+    for start in free_rows:
+        # Unscanned columns are remaining[:count]; the arrays below are kept aligned with it
+        remaining = columns.copy()
+        count = m
+        shortest = np.full(m, np.inf)
+        via = np.full(m, -1, dtype=np.int64)  # row before each column on its shortest path
+        potential = v.copy()
+        scanned = []  # (column, row before it, distance) in scan order
+        i = start
+        lowest = 0.0
+        while True:
+            reduced = cost[i][remaining[:count]]
+            reduced -= potential[:count]
+            reduced += lowest - u[i]
+            via[:count][reduced < shortest[:count]] = i
+            np.minimum(shortest[:count], reduced, out=shortest[:count])
+            k = int(np.argmin(shortest[:count]))
+            j = int(remaining[k])
+            lowest = float(shortest[k])
+            scanned.append((j, int(via[k]), lowest))
+            count -= 1
+            remaining[k] = remaining[count]
+            shortest[k] = shortest[count]
+            via[k] = via[count]
+            potential[k] = potential[count]
+            if row4col[j] == -1:
+                break
+            i = int(row4col[j])
+
+        # Update potentials of the rows and columns the search reached
+        u[start] += lowest
+        for j, _, distance in scanned[:-1]:
+            u[row4col[j]] += lowest - distance
+            v[j] -= lowest - distance
+
+        # Augment along the shortest path ending at the free column
+        previous = {j: row for j, row, _ in scanned}
+        j = scanned[-1][0]
+        while True:
+            i = previous[j]
+            row4col[j] = i
+            j, col4row[i] = int(col4row[i]), j
+            if i == start:
+                break
+    return col4row
+
+
+class HungarianSolver:
+    """Exact maximum weight matching for bipartite graphs (Hungarian algorithm)
+
+    The graph becomes a dense cost matrix between its two sides, with weight 0
+    for missing edges, so leaving a vertex unmatched costs nothing. Graphs
+    that are not bipartite, or whose matrix would exceed HUNGARIAN_MAX_CELLS,
+    go to the blossom solver.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+
+    @staticmethod
+    def applies(problem):
+        """True when the problem is bipartite and small enough for a dense matrix"""
+        sides = problem.bipartition()
+        if sides is None:
+            return False
+        right = int(sides.sum())
+        return (len(sides) - right) * right <= HUNGARIAN_MAX_CELLS
+
+    def solve(self):
+        if isinstance(self.problem, GraphMatchingProblem):
+            return self._solve_matching()
+        else:
+            raise ValueError(f"Unsupported problem type: {type(self.problem)}")
+
+    def _solve_matching(self):
+        """Hungarian algorithm on the cost matrix between the two sides"""
+        problem = self.problem
+        if not self.applies(problem):
+            from .blossom import BlossomSolver
+            return BlossomSolver(problem).solve()
+
+        u, v, w = problem.u, problem.v, problem.w
+        useful = np.flatnonzero((u != v) & (w > 0))
+        if len(useful) == 0:
+            return []
+        sides = problem.bipartition()
+        left = np.flatnonzero(sides == 0)
+        right = np.flatnonzero(sides == 1)
+        position = np.empty(problem.n_vertices, dtype=np.int64)
+        position[left] = np.arange(len(left))
+        position[right] = np.arange(len(right))
+
+        # Rows are the smaller side
+        a, b = u[useful], v[useful]
+        on_left = sides[a] == 0
+        rows = position[np.where(on_left, a, b)]
+        cols = position[np.where(on_left, b, a)]
+        shape = (len(left), len(right))
+        if shape[0] > shape[1]:
+            rows, cols = cols, rows
+            shape = shape[::-1]
+        weights = w[useful].astype(np.float64)
+        cost = np.zeros(shape)
+        np.minimum.at(cost, (rows, cols), -weights)  # parallel edges: the heaviest counts
+
+        col4row = _assignment(cost)
+        # Edges on assigned pairs that carry the pair's weight, one per pair
+        chosen = np.flatnonzero((col4row[rows] == cols) & (-weights == cost[rows, cols]))
+        _, first = np.unique(rows[chosen], return_index=True)
+        return sorted(useful[chosen[first]].tolist())
@@ -0,0 +1,357 @@
+import heapq
+import math
+from collections import deque
+from ..spatial import GridIndex
+
+# Improvements smaller than this are treated as noise
+EPSILON = 1e-10
+
+# Candidates tried at each step of a matching path search (its length is the depth)
+PATH_BREADTH = (5, 3, 2, 1, 1)
+
+
+class TourImprover:
+    """2-opt and Or-opt local search for TSP tours
+
+    Moves are only tried towards each city's k nearest neighbours, and cities
+    whose neighbourhood did not change are skipped (don't-look bits). Neighbour
+    lists are built on first use, so improving a few cities of a huge tour
+    only pays for the cities it reaches. The tour is an array with a position
+    index; every move is applied as one or more segment reversals, always
+    reversing the shorter side of the cycle.
+    """
+
+    def __init__(self, problem, neighbors=8):
+        self.problem = problem
+        coords = problem.coords
+        self.xs = coords[:, 0].tolist()
+        self.ys = coords[:, 1].tolist()
+        self.k = min(neighbors, problem.n - 1)
+        self._index = GridIndex(coords)
+        self._neighbors = [None] * problem.n
+
+    def _neighbor_list(self, city):
+        """k nearest other cities of a city, nearest first (computed on first use)"""
+        found = self._neighbors[city]
+        if found is None:
+            nearest = self._index.nearest_k(self.xs[city], self.ys[city], self.k + 1)
+            found = [c for c in nearest if c != city][:self.k]
+            self._neighbors[city] = found
+        return found
+
+    def improve(self, tour, active=None):
+        """Improve a tour until no move applies; active limits the starting cities
+
+        The improved tour starts at the same city as the given one.
+        """
+        self.tour = list(tour)
+        n = len(self.tour)
+        if n < 5:
+            return self.tour
+        first = self.tour[0]
+        self.pos = [0] * self.problem.n
+        for i, city in enumerate(self.tour):
+            self.pos[city] = i
+
+        queue = deque(self.tour if active is None else active)
+        queued = [False] * self.problem.n
+        for city in queue:
+            queued[city] = True
+
+        while queue:
+            city = queue.popleft()
+            queued[city] = False
+            touched = self._two_opt(city)
+            if not touched and n >= 8:
+                touched = self._or_opt(city)
+            if touched:
+                for c in touched:
+                    if not queued[c]:
+                        queued[c] = True
+                        queue.append(c)
+        start = self.pos[first]
+        return self.tour[start:] + self.tour[:start]
+
+    def _dist(self, a, b):
+        return math.hypot(self.xs[a] - self.xs[b], self.ys[a] - self.ys[b])
+
+    def _succ(self, city):
+        return self.tour[(self.pos[city] + 1) % len(self.tour)]
+
+    def _pred(self, city):
+        return self.tour[self.pos[city] - 1]
+
+    def _two_opt(self, a):
+        """Try replacing edges (a, b) and (c, d) by (a, c) and (b, d)"""
+        dist = self._dist
+        for step in (self._succ, self._pred):
+            b = step(a)
+            d_ab = dist(a, b)
+            for c in self._neighbor_list(a):
+                gain = d_ab - dist(a, c)
+                if gain <= EPSILON:
+                    break  # neighbours are sorted, no closer c is left
+                d = step(c)
+                if c == b or d == a:
+                    continue
+                if gain + dist(c, d) - dist(b, d) > EPSILON:
+                    self._exchange(a, b, c, d)
+                    return (a, b, c, d)
+        return None
+
+    def _or_opt(self, a):
+        """Try moving a segment of 1-3 cities starting at a between two other cities"""
+        dist = self._dist
+        for length in (1, 2, 3):
+            s1 = a
+            s2 = a
+            for _ in range(length - 1):
+                s2 = self._succ(s2)
+            p = self._pred(s1)
+            nx = self._succ(s2)
+            segment = {s1, s2, self._succ(s1)} if length == 3 else {s1, s2}
+            if p in segment or nx in segment or p == nx:
+                return None
+            removal_gain = dist(p, s1) + dist(s2, nx) - dist(p, nx)
+            if removal_gain <= EPSILON:
+                continue
+
+            for end in (s1, s2):
+                for c in self._neighbor_list(end):
+                    if dist(end, c) >= removal_gain:
+                        break
+                    if c in segment:
+                        continue
+                    for x in (c, self._pred(c)):
+                        y = self._succ(x)
+                        if x == p or y == p or x in segment or y in segment:
+                            continue
+                        d_xy = dist(x, y)
+                        forward = dist(x, s1) + dist(s2, y) - d_xy
+                        backward = dist(x, s2) + dist(s1, y) - d_xy
+                        if removal_gain - min(forward, backward) > EPSILON:
+                            self._move_segment(s1, s2, p, nx, x, y, reverse=backward < forward)
+                            return (p, nx, s1, s2, x, y)
+        return None
+
+    def _move_segment(self, s1, s2, p, nx, x, y, reverse):
+        """Move segment s1..s2 (between p and nx) between x and y = succ(x)"""
+        self._exchange(p, s1, x, y)    # p x .. nx s2 .. s1 y
+        self._exchange(p, x, nx, s2)   # p nx .. x s2 .. s1 y
+        if not reverse:
+            self._exchange(x, s2, s1, y)  # p nx .. x s1 .. s2 y
+
+    def _exchange(self, a, b, c, d):
+        """2-opt move: drop edges (a, b), (c, d) and add (a, c), (b, d)
+
+        b and d must follow a and c in the same direction around the tour.
+        """
+        if self._succ(a) == b:
+            self._reverse(self.pos[b], self.pos[c])
+        else:
+            self._reverse(self.pos[c], self.pos[b])
+
+    def _reverse(self, i, j):
+        """Reverse the tour from position i forward to position j (cyclically)"""
+        tour, pos = self.tour, self.pos
+        n = len(tour)
+        inner = (j - i) % n + 1
+        if 2 * inner > n:
+            # reversing the rest of the cycle gives the same tour
+            i, j = (j + 1) % n, (i - 1) % n
+            inner = n - inner
+        for _ in range(inner // 2):
+            a, b = tour[i], tour[j]
+            tour[i] = b
+            pos[b] = i
+            tour[j] = a
+            pos[a] = j
+            i = (i + 1) % n
+            j = (j - 1) % n
+
+
+class MatchingImprover:
+    """Local search for weighted matchings using short augmentations
+
+    The moves around a vertex x, all over the CSR adjacency: adding one edge
+    (x, y) and dropping the matched edges at x and y; replacing x's matched
+    edge (x, z) by two edges (x, c) and (z, d), dropping the matched edges at
+    c and d; and, when neither gains, a longer alternating path grown from x.
+    Vertices are processed from a work queue; after a move, every vertex
+    whose matched edge changed is queued again.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        offsets, neighbors, edge_ids = problem.adjacency()
+        self.offsets = offsets.tolist()
+        self.neighbors = neighbors.tolist()
+        self.edge_ids = edge_ids.tolist()
+        self.weights = problem.w[edge_ids].tolist()  # weight of each adjacency entry
+        # Heaviest edge at each vertex: the first entry of its list
+        self.heaviest = [self.weights[k] if k < end else 0
+                         for k, end in zip(self.offsets, self.offsets[1:])]
+
+    def improve(self, matching):
+        """Improve a matching (list of edge indices) until no move applies"""
+        n = self.problem.n_vertices
+        u = self.problem.u.tolist()
+        v = self.problem.v.tolist()
+        w = self.problem.w.tolist()
+        self.mate = [-1] * n
+        self.mate_edge = [-1] * n
+        self.mate_weight = [0] * n
+        for k in matching:
+            self._match(u[k], v[k], k, w[k])
+
+        queue = deque(x for x in range(n) if self.offsets[x + 1] > self.offsets[x])
+        queued = [True] * n
+        while queue:
+            x = queue.popleft()
+            queued[x] = False
+            touched = self._improve_vertex(x)
+            if touched:
+                for y in touched:
+                    if y != -1 and not queued[y]:
+                        queued[y] = True
+                        queue.append(y)
+        return sorted(k for x, k in enumerate(self.mate_edge) if k != -1 and x < self.mate[x])
+
+    def _best_partners(self, x):
+        """Two best (w(x, c) - weight matched at c, entry) over c other than x and its mate"""
+        mate, mate_weight, neighbors, weights = self.mate, self.mate_weight, self.neighbors, self.weights
+        skip = mate[x]
+        first = second = (-math.inf, -1)
+        for k in range(self.offsets[x], self.offsets[x + 1]):
+            if weights[k] <= second[0]:
+                break  # entries are heaviest first and no score exceeds its weight
+            c = neighbors[k]
+            if c == skip or c == x:
+                continue
+            score = weights[k] - mate_weight[c]
+            if score > second[0]:
+                if score > first[0]:
+                    first, second = (score, k), first
+                else:
+                    second = (score, k)
+        return first, second
+
+    def _improve_vertex(self, x):
+        """Apply the best move around x; returns the vertices it touched, or None"""
+        neighbors = self.neighbors
+        first, second = self._best_partners(x)
+        best_gain = first[0] - self.mate_weight[x]
+        best_move = (first[1],) if best_gain > EPSILON else None
+
+        z = self.mate[x]
+        if z != -1 and first[1] != -1:
+            # (x, z) out, (x, c) and (z, d) in
+            z_first, z_second = self._best_partners(z)
+            for score_c, k in (first, second):
+                for score_d, l in (z_first, z_second):
+                    if k == -1 or l == -1:
+                        continue
+                    c, d = neighbors[k], neighbors[l]
+                    if c == d:
+                        continue
+                    gain = score_c + score_d - self.mate_weight[x]
+                    if self.mate[c] == d:
+                        gain += self.mate_weight[c]  # (c, d) was counted twice
+                    if gain > best_gain and gain > EPSILON:
+                        best_gain = gain
+                        best_move = (k, l)
+
+        if best_move is None:
+            path = self._grow_path(x)
+            if path is None:
+                return None
+            return self._apply_path(path)
+        touched = [x, z]
+        if len(best_move) == 1:
+            ends = [(x, best_move[0])]
+        else:
+            ends = [(x, best_move[0]), (z, best_move[1])]
+        for a, k in ends:
+            c = neighbors[k]
+            touched.extend((c, self.mate[c]))
+            self._unmatch(a)
+            self._unmatch(c)
+        for a, k in ends:
+            self._match(a, neighbors[k], self.edge_ids[k], self.weights[k])
+        return touched
+
+    def _top_partners(self, a, blocked, count, lighter):
+        """Up to count best (w(a, c) - weight matched at c, entry) over unblocked c
+        whose edge to a is heavier than `lighter`, best first"""
+        mate_weight, neighbors, weights = self.mate_weight, self.neighbors, self.weights
+        top = []  # min-heap of the best scores so far
+        for k in range(self.offsets[a], self.offsets[a + 1]):
+            weight = weights[k]
+            if weight <= lighter or (len(top) == count and weight <= top[0][0]):
+                break  # entries are heaviest first and no score exceeds its weight
+            c = neighbors[k]
+            if c in blocked:
+                continue
+            score = weight - mate_weight[c]
+            if len(top) < count:
+                heapq.heappush(top, (score, k))
+            elif score > top[0][0]:
+                heapq.heapreplace(top, (score, k))
+        return sorted(top, reverse=True)
+
+    def _grow_path(self, x):
+        """Alternating path from x with positive gain, grown Lin-Kernighan style
+
+        Starting with x free (its matched edge dropped), the free end a takes
+        an edge (a, c) and c's matched edge is dropped, leaving c's mate as the
+        new free end. Only the best few c are tried at each step, and only
+        while the gain so far plus the added edge stays positive. Returns the
+        added edges as (vertex, entry) pairs.
+        """
+        heaviest = self.heaviest
+        z = self.mate[x]
+        if heaviest[x] - self.mate_weight[x] <= EPSILON:
+            return None  # no edge at x outweighs the one it gives up
+        blocked = {x, z}
+
+        def grow(a, gain, depth):
+            for score, k in self._top_partners(a, blocked, PATH_BREADTH[depth], EPSILON - gain):
+                if gain + score > EPSILON:
+                    return [(a, k)]
+                c = self.neighbors[k]
+                c_mate = self.mate[c]
+                # the next edge weighs at most heaviest[c_mate]
+                if depth + 1 < len(PATH_BREADTH) and gain + score + heaviest[c_mate] > EPSILON:
+                    blocked.update((c, c_mate))
+                    rest = grow(c_mate, gain + score, depth + 1)
+                    if rest is not None:
+                        return [(a, k)] + rest
+                    blocked.discard(c)
+                    blocked.discard(c_mate)
+            return None
+
+        return grow(x, -self.mate_weight[x], 0)
+
+    def _apply_path(self, path):
+        """Add the (vertex, entry) edges of a path, dropping the matched edges they meet"""
+        touched = []
+        for a, k in path:
+            c = self.neighbors[k]
+            touched.extend((a, self.mate[a], c, self.mate[c]))
+            self._unmatch(a)
+            self._unmatch(c)
+        for a, k in path:
+            self._match(a, self.neighbors[k], self.edge_ids[k], self.weights[k])
+        return touched
+
+    def _match(self, a, b, k, weight):
+        self.mate[a], self.mate[b] = b, a
+        self.mate_edge[a] = self.mate_edge[b] = k
+        self.mate_weight[a] = self.mate_weight[b] = weight
+
+    def _unmatch(self, a):
+        b = self.mate[a]
+        if b != -1:
+            self.mate[a] = self.mate[b] = -1
+            self.mate_edge[a] = self.mate_edge[b] = -1
+            self.mate_weight[a] = self.mate_weight[b] = 0
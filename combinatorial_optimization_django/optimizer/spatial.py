@@ -0,0 +1,155 @@
+import heapq
+import math
+import numpy as np
+
+
+class GridIndex:
+    """Uniform grid over 2-D points with nearest-neighbour queries and deletion
+
+    Points are bucketed into square cells holding about `per_cell` points each.
+    A query scans rings of cells around the query point until no unscanned
+    cell can hold anything closer. Removal is O(1); once three quarters of
+    the points are gone the grid is rebuilt over the survivors, so the cells
+    stay dense and the total rebuild cost stays linear.
+    """
+
+    def __init__(self, coords, points=None, per_cell=2):
+        coords = np.asarray(coords, dtype=np.float64)
+        self.xs = coords[:, 0].tolist()
+        self.ys = coords[:, 1].tolist()
+        self.per_cell = per_cell
+        self._cell = [0] * len(self.xs)
+        self._slot = [0] * len(self.xs)
+        if points is None:
+            points = range(len(self.xs))
+        self._build(list(points))
+
+    def __len__(self):
+        return self.count
+
+    def _build(self, points):
+        """Bucket points into a fresh grid sized for their number and extent"""
+        self.count = len(points)
+        self.built_count = len(points)
+        if not points:
+            self.side = 0
+            self.cells = []
+            return
+        ids = np.asarray(points)
+        x = np.asarray(self.xs)[ids]
+        y = np.asarray(self.ys)[ids]
+        self.min_x = float(x.min())
+        self.min_y = float(y.min())
+        span = max(float(x.max()) - self.min_x, float(y.max()) - self.min_y)
+        self.side = max(1, int(math.sqrt(len(points) / self.per_cell)))
+        self.size = span / self.side if span > 0 else 1.0
+
+        cx = np.minimum(((x - self.min_x) / self.size).astype(np.int64), self.side - 1)
+        cy = np.minimum(((y - self.min_y) / self.size).astype(np.int64), self.side - 1)
+        cell_ids = cy * self.side + cx
+        order = np.argsort(cell_ids, kind='stable')
+        sorted_points = ids[order].tolist()
+        bounds = np.searchsorted(cell_ids[order], np.arange(self.side * self.side + 1)).tolist()
+
+        self.cells = []
+        for c in range(self.side * self.side):
+            members = sorted_points[bounds[c]:bounds[c + 1]]
+            for slot, p in enumerate(members):
+                self._cell[p] = c
+                self._slot[p] = slot
+            self.cells.append(members)
+
+    def remove(self, p):
+        """Delete point p from the index"""
+        members = self.cells[self._cell[p]]
+        last = members.pop()
+        if last != p:
+            slot = self._slot[p]
+            members[slot] = last
+            self._slot[last] = slot
+        self.count -= 1
+        if 0 < self.count < self.built_count // 4:
+            self._build([q for members in self.cells for q in members])
+
+    def nearest(self, x, y):
+        """Closest remaining point to (x, y), or -1 when the index is empty"""
+        if self.count == 0:
+            return -1
+        xs, ys, cells, side = self.xs, self.ys, self.cells, self.side
+        cx = min(max(int((x - self.min_x) / self.size), 0), side - 1)
+        cy = min(max(int((y - self.min_y) / self.size), 0), side - 1)
+
+        best = -1
+        best_d2 = math.inf
+        r = 0
+        while True:
+            for c in self._ring(cx, cy, r):
+                for p in cells[c]:
+                    dx = xs[p] - x
+                    dy = ys[p] - y
+                    d2 = dx * dx + dy * dy
+                    if d2 < best_d2:
+                        best_d2 = d2
+                        best = p
+            # Anything not scanned yet lies outside the square of rings 0..r
+            if best >= 0:
+                margin = min(x - (self.min_x + (cx - r) * self.size),
+                             self.min_x + (cx + r + 1) * self.size - x,
+                             y - (self.min_y + (cy - r) * self.size),
+                             self.min_y + (cy + r + 1) * self.size - y)
+                if margin > 0 and margin * margin >= best_d2:
+                    return best
+            if r >= side:
+                return best
+            r += 1
+
+    def nearest_k(self, x, y, k):
+        """Up to k remaining points closest to (x, y), nearest first"""
+        k = min(k, self.count)
+        if k <= 0:
+            return []
+        xs, ys, cells, side = self.xs, self.ys, self.cells, self.side
+        cx = min(max(int((x - self.min_x) / self.size), 0), side - 1)
+        cy = min(max(int((y - self.min_y) / self.size), 0), side - 1)
+
+        best = []  # max-heap of (-d2, p) holding the k closest points so far
+        r = 0
+        while True:
+            for c in self._ring(cx, cy, r):
+                for p in cells[c]:
+                    dx = xs[p] - x
+                    dy = ys[p] - y
+                    d2 = dx * dx + dy * dy
+                    if len(best) < k:
+                        heapq.heappush(best, (-d2, p))
+                    elif d2 < -best[0][0]:
+                        heapq.heapreplace(best, (-d2, p))
+            if len(best) == k:
+                margin = min(x - (self.min_x + (cx - r) * self.size),
+                             self.min_x + (cx + r + 1) * self.size - x,
+                             y - (self.min_y + (cy - r) * self.size),
+                             self.min_y + (cy + r + 1) * self.size - y)
+                if margin > 0 and margin * margin >= -best[0][0]:
+                    break
+            if r >= side:
+                break
+            r += 1
+        return [p for _, p in sorted(best, reverse=True)]
+
+    def _ring(self, cx, cy, r):
+        """Cell ids at Chebyshev distance exactly r from cell (cx, cy)"""
+        side = self.side
+        if r == 0:
+            yield cy * side + cx
+            return
+        lo_x = max(cx - r, 0)
+        hi_x = min(cx + r, side - 1)
+        for row in (cy - r, cy + r):
+            if 0 <= row < side:
+                base = row * side
+                for col in range(lo_x, hi_x + 1):
+                    yield base + col
+        for col in (cx - r, cx + r):
+            if 0 <= col < side:
+                for row in range(max(cy - r + 1, 0), min(cy + r - 1, side - 1) + 1):
+                    yield row * side + col
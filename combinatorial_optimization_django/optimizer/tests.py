@@ -1,3 +1,653 @@
+import io
+import itertools
+import math
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
+import numpy as np
+import psutil
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from .benchmark import SOLVER_TIMEOUT, _PeakMemory, benchmark_single, run_isolated, runtime_stats
+from .forms import ProblemForm
+from .jobs import STALE_JOB_GRACE, claim_job, fail_stale_jobs, run_job, submit_job
+from .management.commands.benchmark_sweep import Command as SweepCommand, compare, load_records
+from .models import SolveJob
+from .preprocessing import KnapsackReduction
+from .problems.knapsack import KnapsackProblem
+from .problems.tsp import TSPProblem, LazyDistanceMatrix, FLOAT32_DISTANCE_THRESHOLD, LAZY_DISTANCE_THRESHOLD
+from .problems.graph_matching import GraphMatchingProblem
+from .spatial import GridIndex
+from .solvers.backtracking import BacktrackingSolver
+from .solvers.blossom import BlossomSolver
+from .solvers.branch_bound import BranchBoundSolver
+from .solvers.divide_conquer import DivideConquerSolver
+from .solvers.dynamic_programming import DPSolver
+from .solvers.greedy import GreedySolver
+from .solvers.hungarian import HungarianSolver
+from .solvers.local_search import MatchingImprover, TourImprover
 
-# Create your tests here.
+
+def brute_force_knapsack(problem):
+    """Best value over every subset of items"""
+    n = len(problem.values)
+    best = 0
+    for mask in range(1 << n):
+        items = [i for i in range(n) if mask >> i & 1]
+        if sum(problem.weights[i] for i in items) <= problem.capacity:
+            best = max(best, sum(problem.values[i] for i in items))
+    return best
+
+
+def brute_force_tsp(problem):
+    """Length of the shortest tour over every permutation starting at city 0"""
+    return min(problem.evaluate([0] + list(rest)) for rest in itertools.permutations(range(1, problem.n)))
+
+
+def brute_force_matching(problem):
+    """Weight of the heaviest matching over every set of edges"""
+    edges = list(problem.edges)
+
+    def best(k, used):
+        if k == len(edges):
+            return 0
+        u, v, w = edges[k]
+        skip = best(k + 1, used)
+        if u != v and u not in used and v not in used:
+            return max(skip, w + best(k + 1, used | {u, v}))
+        return skip
+
+    return best(0, frozenset())
+
+
+def greedy_matching(problem):
+    """Edge indices taken heaviest first while both ends are free"""
+    used = set()
+    matching = []
+    for k in sorted(range(len(problem.edges)), key=lambda k: -problem.w[k]):
+        u, v = int(problem.u[k]), int(problem.v[k])
+        if problem.w[k] > 0 and u != v and u not in used and v not in used:
+            used.update((u, v))
+            matching.append(k)
+    return matching
+
+
+class SleepingSolver:
+    """Solver that never finishes in time"""
+
+    def __init__(self, problem):
+        self.problem = problem
+
+    def solve(self):
+        time.sleep(60)
+
+
+class HugeAllocationSolver(SleepingSolver):
+    """Solver that asks for 64 GB at once"""
+
+    def solve(self):
+        return bytearray(64 << 30)
+
+
+class RaisingSolver(SleepingSolver):
+    """Solver that crashes"""
+
+    def solve(self):
+        raise ValueError("broken solver")
+
+
+def random_knapsack(rng, n):
+    """Random knapsack instance; some use correlated values or repeated items"""
+    kind = rng.choice(["uniform", "correlated", "duplicates"])
+    weights = [rng.randint(1, 30) for _ in range(n)]
+    if kind == "correlated":
+        values = [w + 10 for w in weights]
+    else:
+        values = [rng.randint(1, 40) for _ in range(n)]
+    if kind == "duplicates":
+        picks = [rng.randrange(n) for _ in range(n)]
+        weights = [weights[i] for i in picks]
+        values = [values[i] for i in picks]
+    capacity = rng.randint(0, sum(weights))
+    return KnapsackProblem(weights, values, capacity)
+
+
+def random_graph(rng, vertices, edges, bipartite=False):
+    """Random matching instance with integer weights; parallel edges may occur"""
+    edge_list = []
+    for _ in range(edges):
+        if bipartite:
+            u = rng.randrange(vertices // 2)
+            v = vertices // 2 + rng.randrange(vertices - vertices // 2)
+        else:
+            u, v = rng.sample(range(vertices), 2)
+        edge_list.append((u, v, rng.randint(1, 20)))
+    return GraphMatchingProblem(edge_list)
+
+
+class KnapsackSolverTests(TestCase):
+    def check(self, problem, SolverClass, optimum):
+        solution = SolverClass(problem).solve()
+        self.assertTrue(problem.is_valid_solution(solution))
+        self.assertEqual(len(set(solution)), len(solution))
+        self.assertEqual(problem.evaluate(solution), optimum)
+
+    def check_against_brute_force(self, SolverClass):
+        rng = random.Random(1)
+        for trial in range(60):
+            problem = random_knapsack(rng, rng.randint(1, 12))
+            with self.subTest(trial=trial):
+                self.check(problem, SolverClass, brute_force_knapsack(problem))
+
+    def test_dp_matches_brute_force(self):
+        self.check_against_brute_force(DPSolver)
+
+    def test_dp_on_large_or_fractional_weights(self):
+        # A capacity-indexed table would have billions of columns, so these
+        # only finish through the value-indexed table or the GCD scaling
+        rng = random.Random(7)
+        for trial in range(30):
+            problem = random_knapsack(rng, rng.randint(1, 12))
+            if trial % 3 == 0:
+                weights = [w * 10**9 + rng.randint(0, 10**6) for w in problem.weights]
+                capacity = problem.capacity * 10**9
+            elif trial % 3 == 1:
+                weights = [w * 10**9 for w in problem.weights]
+                capacity = problem.capacity * 10**9
+            else:
+                weights = [w + rng.random() for w in problem.weights]
+                capacity = problem.capacity + 0.5
+            problem = KnapsackProblem(weights, problem.values, capacity)
+            with self.subTest(trial=trial):
+                self.check(problem, DPSolver, brute_force_knapsack(problem))
+
+    def check_fptas(self, seed, guarantee):
+        """FPTAS packings must be feasible, worth guarantee(epsilon) of the optimum,
+        and have an upper_bound covering both the optimum and their value"""
+        rng = random.Random(seed)
+        for trial in range(60):
+            problem = random_knapsack(rng, rng.randint(1, 12))
+            optimum = brute_force_knapsack(problem)
+            for epsilon in (0.5, 0.1, 0.01):
+                with self.subTest(trial=trial, epsilon=epsilon):
+                    solver = DPSolver(problem, epsilon=epsilon)
+                    solution = solver.solve()
+                    self.assertTrue(problem.is_valid_solution(solution))
+                    value = problem.evaluate(solution)
+                    self.assertGreaterEqual(value, guarantee(epsilon) * optimum - 1e-9)
+                    self.assertGreaterEqual(solver.upper_bound, optimum - 1e-9)
+                    self.assertGreaterEqual(solver.upper_bound, value)
+
+    def test_fptas_is_within_epsilon_of_optimum(self):
+        self.check_fptas(2, lambda epsilon: 1 - epsilon)
+
+    def test_fptas_under_a_small_memory_budget(self):
+        # Coarser rounding loosens the guarantee, but the packing is never
+        # worse than the greedy one, which is worth half the optimum
+        with mock.patch("optimizer.solvers.dynamic_programming.FPTAS_MEMORY_BYTES", 8):
+            self.check_fptas(8, lambda epsilon: 0.5)
+
+    def test_reduction_preserves_optimum(self):
+        rng = random.Random(3)
+        for trial in range(60):
+            problem = random_knapsack(rng, rng.randint(1, 12))
+            optimum = brute_force_knapsack(problem)
+            with self.subTest(trial=trial):
+                reduction = KnapsackReduction(problem)
+                reduced = reduction.problem
+                self.assertEqual(brute_force_knapsack(reduced) + reduction.fixed_value, optimum)
+                solution = reduction.expand(DPSolver(reduced).solve())
+                self.assertTrue(problem.is_valid_solution(solution))
+                self.assertEqual(problem.evaluate(solution), optimum)
+
+    def test_branch_bound_matches_brute_force(self):
+        self.check_against_brute_force(BranchBoundSolver)
+
+    def test_meet_in_the_middle_matches_brute_force(self):
+        self.check_against_brute_force(DivideConquerSolver)
+
+    def test_backtracking_matches_brute_force(self):
+        self.check_against_brute_force(BacktrackingSolver)
+
+
+class TSPProblemTests(TestCase):
+    def check_rows(self, problem, rows):
+        """Stored or computed rows must match float64 distances within float32 precision"""
+        for i in rows:
+            with self.subTest(row=i):
+                dense = np.sqrt(((problem.coords - problem.coords[i]) ** 2).sum(axis=1))
+                np.testing.assert_allclose(problem.distance_matrix[i], dense, rtol=1e-6, atol=1e-4)
+
+    def test_float32_matrix_matches_dense_distances(self):
+        random.seed(0)
+        problem = TSPProblem.generate_random_instance(FLOAT32_DISTANCE_THRESHOLD + 1)
+        self.assertEqual(problem.distance_matrix.dtype, np.float32)
+        self.check_rows(problem, range(0, problem.n, 10))
+
+    def test_lazy_rows_match_dense_distances(self):
+        random.seed(1)
+        problem = TSPProblem.generate_random_instance(LAZY_DISTANCE_THRESHOLD + 1)
+        self.assertIsInstance(problem.distance_matrix, LazyDistanceMatrix)
+        self.assertEqual(len(problem.distance_matrix), problem.n)
+        # More rows than the cache holds, then some that were evicted
+        rows = list(range(0, problem.n, 50))
+        self.check_rows(problem, rows + rows[:5])
+
+    def test_from_coords_skips_the_distance_matrix(self):
+        random.seed(12)
+        problem = TSPProblem.generate_random_instance(300)
+        region = TSPProblem.from_coords(problem.coords)
+        self.assertIsInstance(region.distance_matrix, LazyDistanceMatrix)
+        self.assertEqual(GreedySolver(region).solve(), GreedySolver(problem).solve())
+        self.assertEqual(len(region.distance_matrix._rows), 0)  # no row was ever computed
+        self.check_rows(region, [0, 150, 299])
+
+
+class GridIndexTests(TestCase):
+    def check_queries(self, index, coords, remaining, rng):
+        """nearest and nearest_k must find the same distances as a scan of the remaining points"""
+        remaining = np.asarray(sorted(remaining))
+        for _ in range(50):
+            # Queries also fall outside the bounding box of the points
+            x, y = rng.uniform(-20, 120), rng.uniform(-20, 120)
+            distances = np.hypot(coords[remaining, 0] - x, coords[remaining, 1] - y)
+            expected = np.sort(distances)
+            p = index.nearest(x, y)
+            self.assertIn(p, remaining)
+            self.assertAlmostEqual(math.hypot(coords[p, 0] - x, coords[p, 1] - y), expected[0])
+            k = rng.randint(1, 12)
+            found = index.nearest_k(x, y, k)
+            self.assertEqual(len(set(found)), min(k, len(remaining)))
+            self.assertTrue(set(found) <= set(remaining.tolist()))
+            np.testing.assert_allclose(np.hypot(coords[found, 0] - x, coords[found, 1] - y), expected[:k])
+
+    def test_queries_match_brute_force_before_and_after_rebuild(self):
+        rng = random.Random(9)
+        coords = np.array([(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(2000)])
+        coords[:100] = coords[100:200]  # duplicate points give ties
+        index = GridIndex(coords)
+        remaining = set(range(len(coords)))
+        self.check_queries(index, coords, remaining, rng)
+
+        # Removing more than three quarters of the points rebuilds the grid
+        for p in rng.sample(sorted(remaining), 1600):
+            index.remove(p)
+            remaining.discard(p)
+        self.assertEqual(len(index), 400)
+        self.assertLess(index.built_count, len(coords))
+        self.check_queries(index, coords, remaining, rng)
+
+        for p in remaining:
+            index.remove(p)
+        self.assertEqual(index.nearest(50, 50), -1)
+        self.assertEqual(index.nearest_k(50, 50, 3), [])
+
+
+class TSPSolverTests(TestCase):
+    def check_against_brute_force(self, SolverClass):
+        for seed in range(20):
+            random.seed(seed)
+            problem = TSPProblem.generate_random_instance(random.randint(2, 8))
+            optimum = brute_force_tsp(problem)
+            with self.subTest(seed=seed):
+                tour = SolverClass(problem).solve()
+                self.assertEqual(sorted(tour), list(range(problem.n)))
+                self.assertAlmostEqual(problem.evaluate(tour), optimum, places=6)
+
+    def test_held_karp_matches_brute_force(self):
+        self.check_against_brute_force(DPSolver)
+
+    def test_branch_bound_matches_brute_force(self):
+        self.check_against_brute_force(BranchBoundSolver)
+
+    def test_backtracking_matches_brute_force(self):
+        self.check_against_brute_force(BacktrackingSolver)
+
+    def test_divide_conquer_tour_of_a_decomposed_instance(self):
+        random.seed(11)
+        problem = TSPProblem.generate_random_instance(2500)  # four regions of 625 cities
+        tour = DivideConquerSolver(problem).solve()
+        self.assertEqual(sorted(tour), list(range(problem.n)))
+        self.assertEqual(tour[0], 0)
+
+
+class TourImproverTests(TestCase):
+    def test_improved_tours_are_valid_and_no_longer(self):
+        rng = random.Random(10)
+        for trial in range(30):
+            random.seed(trial)
+            problem = TSPProblem.generate_random_instance(rng.randint(2, 300))
+            tour = list(range(problem.n))
+            rng.shuffle(tour)
+            with self.subTest(trial=trial, n=problem.n):
+                improved = TourImprover(problem).improve(tour)
+                self.assertEqual(sorted(improved), list(range(problem.n)))
+                self.assertEqual(improved[0], tour[0])
+                self.assertLessEqual(problem.evaluate(improved), problem.evaluate(tour) + 1e-9)
+
+    def test_two_opt_removes_a_crossing(self):
+        # Six points around a 2 x 1 rectangle; the tour crosses itself between 2-4 and 3-5
+        problem = TSPProblem([(0, 0), (1, 0), (2, 0), (2, 1), (1, 1), (0, 1)])
+        tour = [0, 1, 2, 4, 3, 5]
+        self.assertGreater(problem.evaluate(tour), 6.5)
+        improved = TourImprover(problem).improve(tour)
+        self.assertEqual(improved[0], 0)
+        self.assertAlmostEqual(problem.evaluate(improved), 6.0)
+
+
+class MatchingGeneratorTests(TestCase):
+    def edges(self, n, p, seed):
+        """Generated edges as (u, v) vertex pairs"""
+        random.seed(seed)
+        problem = GraphMatchingProblem.generate_random_instance(n, p)
+        return list(zip(problem.labels[problem.u].tolist(), problem.labels[problem.v].tolist()))
+
+    def test_edges_are_distinct_ordered_pairs(self):
+        for seed, (n, p) in enumerate([(2, 0.5), (10, 0.3), (50, 0.1), (200, 0.05), (300, 0.9)]):
+            with self.subTest(n=n, p=p):
+                edges = self.edges(n, p, seed)
+                self.assertEqual(len(set(edges)), len(edges))
+                self.assertTrue(all(0 <= u < v < n for u, v in edges))
+
+    def test_extreme_probabilities(self):
+        for n in (1, 2, 7, 60):
+            with self.subTest(n=n):
+                complete = {(u, v) for u in range(n) for v in range(u + 1, n)}
+                self.assertEqual(sorted(self.edges(n, 1.0, n)), sorted(complete))
+                self.assertEqual(self.edges(n, 0, n), [])
+
+    def test_edge_count_is_near_its_expectation(self):
+        n, p = 400, 0.3
+        pairs = n * (n - 1) // 2
+        spread = (pairs * p * (1 - p)) ** 0.5
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                self.assertLess(abs(len(self.edges(n, p, seed)) - pairs * p), 5 * spread)
+
+
+class MatchingSolverTests(TestCase):
+    def check(self, problem, SolverClass, optimum):
+        matching = SolverClass(problem).solve()
+        self.assertTrue(problem.is_valid_matching(matching))
+        self.assertEqual(problem.evaluate(matching), optimum)
+
+    def check_against_brute_force(self, SolverClass):
+        rng = random.Random(4)
+        for trial in range(60):
+            problem = random_graph(rng, rng.randint(2, 9), rng.randint(1, 12))
+            with self.subTest(trial=trial):
+                self.check(problem, SolverClass, brute_force_matching(problem))
+
+    def check_against_bitmask_dp(self, SolverClass, bipartite=False):
+        # Too many edges for brute force; the DP is checked against brute force itself
+        rng = random.Random(6)
+        for trial in range(30):
+            problem = random_graph(rng, rng.randint(8, 16), rng.randint(10, 60), bipartite=bipartite)
+            with self.subTest(trial=trial):
+                self.check(problem, SolverClass, problem.evaluate(DPSolver(problem).solve()))
+
+    def test_blossom_matches_brute_force(self):
+        self.check_against_brute_force(BlossomSolver)
+
+    def test_backtracking_matches_brute_force(self):
+        self.check_against_brute_force(BacktrackingSolver)
+
+    def test_divide_conquer_matches_brute_force(self):
+        # More than 10 edges go through the per-component blossom path
+        self.check_against_brute_force(DivideConquerSolver)
+
+    def test_bitmask_dp_matches_brute_force(self):
+        self.check_against_brute_force(DPSolver)
+
+    def test_blossom_matches_bitmask_dp_on_larger_graphs(self):
+        self.check_against_bitmask_dp(BlossomSolver)
+        self.check_against_bitmask_dp(BlossomSolver, bipartite=True)
+
+    def test_branch_bound_matches_brute_force(self):
+        self.check_against_brute_force(BranchBoundSolver)
+
+    def test_branch_bound_matches_bitmask_dp_on_larger_graphs(self):
+        self.check_against_bitmask_dp(BranchBoundSolver)
+
+    def test_hungarian_matches_brute_force_on_bipartite_graphs(self):
+        rng = random.Random(5)
+        for trial in range(60):
+            problem = random_graph(rng, rng.randint(2, 10), rng.randint(1, 12), bipartite=True)
+            with self.subTest(trial=trial):
+                self.assertTrue(HungarianSolver.applies(problem))
+                self.check(problem, HungarianSolver, brute_force_matching(problem))
+
+    def test_hungarian_matches_bitmask_dp_on_larger_bipartite_graphs(self):
+        self.check_against_bitmask_dp(HungarianSolver, bipartite=True)
+
+
+class MatchingImproverTests(TestCase):
+    def test_improved_matchings_are_valid_and_between_greedy_and_optimum(self):
+        rng = random.Random(13)
+        for trial in range(40):
+            if trial % 2:
+                problem = random_graph(rng, rng.randint(2, 60), rng.randint(1, 300))
+            else:
+                random.seed(trial)
+                problem = GraphMatchingProblem.generate_random_instance(rng.randint(2, 80), rng.uniform(0.02, 0.5))
+            greedy = greedy_matching(problem)
+            with self.subTest(trial=trial):
+                matching = MatchingImprover(problem).improve(greedy)
+                self.assertEqual(len(set(matching)), len(matching))
+                self.assertTrue(all(0 <= k < len(problem.edges) for k in matching))
+                self.assertTrue(problem.is_valid_matching(matching))
+                weight = problem.evaluate(matching)
+                self.assertGreaterEqual(weight, problem.evaluate(greedy) - 1e-9)
+                self.assertLessEqual(weight, problem.evaluate(BlossomSolver(problem).solve()) + 1e-9)
+
+
+class JobQueueTests(TestCase):
+    def submit(self, algorithms=("Greedy", "DynamicProgramming")):
+        problem = KnapsackProblem([3, 4, 5, 9], [4, 5, 6, 10], 12)
+        return submit_job(problem, "knapsack", algorithms)
+
+    def test_submit_queues_a_job(self):
+        job = self.submit()
+        self.assertEqual(job.status, "queued")
+        self.assertEqual(job.session.session_id, job.job_id)
+        self.assertEqual(job.session.problem_data["capacity"], 12)
+        self.assertIsNone(job.started_at)
+
+    def test_claim_takes_exactly_one_job(self):
+        first = self.submit()
+        second = self.submit()
+        job = claim_job("worker-a")
+        self.assertEqual(job.pk, first.pk)
+        self.assertEqual(job.status, "running")
+        self.assertEqual(job.worker, "worker-a")
+        self.assertIsNotNone(job.started_at)
+        self.assertEqual(SolveJob.objects.filter(status="running").count(), 1)
+        second.refresh_from_db()
+        self.assertEqual(second.status, "queued")
+        self.assertEqual(claim_job("worker-b").pk, second.pk)
+        self.assertIsNone(claim_job("worker-c"))
+
+    def test_stale_running_job_is_failed(self):
+        stale = self.submit()
+        fresh = self.submit()
+        claim_job("worker-a")
+        claim_job("worker-b")
+        limit = SOLVER_TIMEOUT * len(stale.algorithms) + STALE_JOB_GRACE
+        SolveJob.objects.filter(pk=stale.pk).update(started_at=timezone.now() - timedelta(seconds=limit + 1))
+        self.assertEqual(fail_stale_jobs(), 1)
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual(stale.status, "failed")
+        self.assertIn("worker-a", stale.error)
+        self.assertIsNotNone(stale.finished_at)
+        self.assertEqual(fresh.status, "running")
+
+    def test_run_job_stores_results(self):
+        job = self.submit()
+        run_job(claim_job("worker-a"))
+        job.refresh_from_db()
+        self.assertEqual(job.status, "done")
+        self.assertIsNotNone(job.finished_at)
+        results = job.session.results.order_by("created_at")
+        self.assertEqual([result.algorithm for result in results], ["Greedy", "DP"])
+        self.assertTrue(all(result.status == "completed" for result in results))
+        self.assertEqual(results[1].objective_value, 15)
+
+    def test_job_status(self):
+        response = self.client.get(reverse("job_status", args=["no-such-job"]))
+        self.assertEqual(response.status_code, 404)
+
+        job = self.submit(["DynamicProgramming"])
+        url = reverse("job_status", args=[job.job_id])
+        data = self.client.get(url).json()
+        self.assertEqual(data["status"], "queued")
+        self.assertNotIn("results", data)
+
+        run_job(claim_job("worker-a"))
+        data = self.client.get(url).json()
+        self.assertEqual(data["status"], "done")
+        self.assertEqual(data["results_url"], reverse("results", args=[job.job_id]))
+        self.assertEqual(len(data["results"]), 1)
+        self.assertEqual(data["results"][0]["objective_value"], 15)
+
+
+class IsolatedRunTests(TestCase):
+    def test_unfinished_runs_are_recorded_with_their_status(self):
+        problem = KnapsackProblem([3, 4, 5], [4, 5, 6], 8)
+        solvers = [SleepingSolver, HugeAllocationSolver, RaisingSolver, DPSolver]
+        # Room for the forked test process, but far below the allocation
+        memory_limit_mb = (psutil.Process().memory_info().vms >> 20) + 512
+        with self.assertLogs("optimizer.benchmark", "WARNING") as logs:
+            results = run_isolated([(SolverClass, problem, {}) for SolverClass in solvers],
+                                   timeout=1, memory_limit_mb=memory_limit_mb, max_parallel=len(solvers))
+        self.assertEqual([result["status"] for result in results],
+                         ["timeout", "out_of_memory", "failed", "completed"])
+        for result in results[:3]:
+            with self.subTest(algorithm=result["algorithm"]):
+                self.assertEqual(result["solution"], [])
+                self.assertIsNone(result["objective_value"])
+                self.assertIsNone(result["memory_mb"])
+                self.assertIsNone(result["cpu_sec"])
+                self.assertIsNone(result["runtime_stats"])
+        self.assertGreaterEqual(results[0]["runtime_sec"], 1)
+        self.assertLess(results[0]["runtime_sec"], 10)
+        self.assertEqual(results[3]["objective_value"], 10)
+        self.assertTrue(any("broken solver" in line for line in logs.output))
+
+    def test_workers_share_the_cpus(self):
+        cpus = os.cpu_count() or 1
+        with mock.patch("optimizer.jobs.work") as work:
+            call_command("run_workers", once=True, stdout=io.StringIO())
+        work.assert_called_once_with(poll_interval=1.0, once=True, max_parallel=cpus)
+
+
+class MemoryMeasurementTests(TestCase):
+    def test_peak_covers_an_allocation(self):
+        meter = _PeakMemory()
+        meter.start()
+        buffer = np.ones(100 << 17)  # 100 MB, touched
+        peak = meter.stop()
+        del buffer
+        self.assertGreater(peak, 90)
+        self.assertLess(peak, 200)
+
+    def test_fresh_process_does_not_report_the_parent_footprint(self):
+        buffer = np.ones(400 << 17)  # 400 MB held by this process
+        problem = KnapsackProblem([3, 4, 5], [4, 5, 6], 8)
+        result = run_isolated([(GreedySolver, problem, {})], fresh=True)[0]
+        del buffer
+        self.assertEqual(result["status"], "completed")
+        self.assertLess(result["memory_mb"], 20)
+
+
+class RepeatedTrialTests(TestCase):
+    def form(self, **fields):
+        data = {"problem_type": "knapsack", "input_method": "random", "algorithms": ["Greedy"], "random_size": 10}
+        data.update(fields)
+        return ProblemForm(data)
+
+    def test_runtime_stats_of_known_samples(self):
+        stats = runtime_stats([5.0, 1.0, 4.0, 2.0, 3.0])
+        self.assertEqual(stats["median"], 3.0)
+        self.assertEqual(stats["min"], 1.0)
+        self.assertAlmostEqual(stats["p95"], 4.8)  # linear interpolation between 4 and 5
+        self.assertLessEqual(1.0, stats["ci_low"])
+        self.assertLessEqual(stats["ci_low"], 3.0)
+        self.assertLessEqual(3.0, stats["ci_high"])
+        self.assertLessEqual(stats["ci_high"], 5.0)
+        self.assertEqual(runtime_stats([5.0, 1.0, 4.0, 2.0, 3.0]), stats)  # fixed resampling seed
+
+    def test_single_sample_has_no_confidence_interval(self):
+        stats = runtime_stats([0.25])
+        self.assertEqual((stats["median"], stats["min"], stats["p95"]), (0.25, 0.25, 0.25))
+        self.assertIsNone(stats["ci_low"])
+        self.assertIsNone(stats["ci_high"])
+
+    def test_min_time_loops_a_fast_solver(self):
+        problem = KnapsackProblem([3, 4, 5], [4, 5, 6], 8)
+        result = benchmark_single(GreedySolver, problem, repeat=3, warmup=1, min_time=0.005)
+        self.assertGreater(result["loops"], 1)
+        self.assertEqual(len(result["runtime_samples"]), 3)
+        self.assertIsNotNone(result["runtime_stats"]["ci_low"])
+        # Each sample is the time of one run, averaged over its loops
+        self.assertLess(result["runtime_sec"], 0.005)
+
+    def test_trials_must_fit_the_solver_deadline(self):
+        self.assertTrue(self.form(repeat=5, warmup=1, min_time=1).is_valid())
+        form = self.form(repeat=50, warmup=10, min_time=1)
+        self.assertFalse(form.is_valid())
+        self.assertIn("min_time", form.errors)
+        self.assertFalse(self.form(repeat=int(SOLVER_TIMEOUT), min_time=1).is_valid())
+
+
+def sweep_record(algorithm="DP", status="completed", runtime=1.0, ci=None, seed=0):
+    """Sweep record of one run; ci is (low, high) or None"""
+    low, high = ci or (None, None)
+    completed = status == "completed"
+    return {
+        "problem_type": "knapsack", "size": 20, "seed": seed, "algorithm": algorithm, "status": status,
+        "objective_value": 42.0 if completed else None,
+        "runtime_sec": runtime, "runtime_min": runtime if completed else None,
+        "runtime_p95": runtime if completed else None, "runtime_ci_low": low, "runtime_ci_high": high,
+        "samples": 5 if completed else 0, "loops": 1 if completed else 0,
+        "cpu_sec": runtime if completed else None, "memory_mb": 1.5 if completed else None,
+    }
+
+
+class SweepComparisonTests(TestCase):
+    def test_slowdown_with_separate_intervals_is_flagged(self):
+        old = sweep_record(runtime=1.0, ci=(0.95, 1.05))
+        new = sweep_record(runtime=1.3, ci=(1.25, 1.35))
+        self.assertEqual(compare([old], [new], threshold=0.1), [(old, new)])
+        # Below the threshold nothing is flagged, however tight the intervals
+        self.assertEqual(compare([old], [sweep_record(runtime=1.08, ci=(1.07, 1.09))], threshold=0.1), [])
+
+    def test_slowdown_within_overlapping_intervals_is_not_flagged(self):
+        old = sweep_record(runtime=1.0, ci=(0.8, 1.3))
+        new = sweep_record(runtime=1.3, ci=(1.1, 1.5))
+        self.assertEqual(compare([old], [new], threshold=0.1), [])
+
+    def test_run_that_stopped_completing_is_flagged(self):
+        old = sweep_record(runtime=1.0, ci=(0.95, 1.05))
+        new = sweep_record(status="timeout", runtime=60.0)
+        self.assertEqual(compare([old], [new], threshold=0.1), [(old, new)])
+        # Runs that did not complete in the baseline, or are not in it, are not compared
+        self.assertEqual(compare([new], [new], threshold=0.1), [])
+        self.assertEqual(compare([old], [sweep_record(status="timeout", seed=1)], threshold=0.1), [])
+
+    def test_csv_round_trip(self):
+        records = [
+            sweep_record(runtime=0.125, ci=(0.1, 0.15)),
+            sweep_record(algorithm="Greedy", runtime=3e-06),
+            sweep_record(algorithm="Backtracking", status="timeout", runtime=60.0),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sweep.csv")
+            with open(path, "w", newline="") as f:
+                SweepCommand()._write(f, "csv", records, {})
+            self.assertEqual(load_records(path), records)
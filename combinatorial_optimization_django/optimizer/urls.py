@@ -4,5 +4,6 @@ from . import views
 urlpatterns = [
     path('', views.index, name='index'),
     path('results/<str:session_id>/', views.results, name='results'),
+    path('jobs/<str:job_id>/', views.job_status, name='job_status'),
     path('legacy/', views.legacy_index, name='legacy'),
 ]
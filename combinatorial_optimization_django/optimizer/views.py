@@ -1,5 +1,6 @@
 from django.shortcuts import render, redirect
 from django.http import JsonResponse
+from django.urls import reverse
 from django.contrib import messages
 import json
 import csv
@@ -8,21 +9,9 @@ from .forms import ProblemForm, KnapsackForm
 from .problems.knapsack import KnapsackProblem
 from .problems.tsp import TSPProblem
 from .problems.graph_matching import GraphMatchingProblem
-from .solvers.greedy import GreedySolver
-from .solvers.divide_conquer import DivideConquerSolver
-from .solvers.dynamic_programming import DPSolver
-from .solvers.backtracking import BacktrackingSolver
-from .solvers.branch_bound import BranchBoundSolver
-from .benchmark import benchmark_multiple, benchmark_single
-from .models import OptimizationResult, BenchmarkSession
-
-SOLVERS = {
-    "Greedy": GreedySolver,
-    "Divide&Conquer": DivideConquerSolver,
-    "DynamicProgramming": DPSolver,
-    "Backtracking": BacktrackingSolver,
-    "Branch&Bound": BranchBoundSolver,
-}
+from .benchmark import SOLVERS, benchmark_single
+from .jobs import submit_job
+from .models import OptimizationResult, BenchmarkSession, SolveJob
 
 def index(request):
     if request.method == "POST":
@@ -37,21 +26,26 @@ def index(request):
                 
                 # Get selected algorithms
                 selected_algorithms = form.cleaned_data["algorithms"]
-                solver_classes = [SOLVERS[alg] for alg in selected_algorithms]
+                solver_options = {}
+                if form.cleaned_data.get("epsilon"):
+                    solver_options["DynamicProgramming"] = {"epsilon": form.cleaned_data["epsilon"]}
+                trials = {
+                    "repeat": form.cleaned_data.get("repeat") or 1,
+                    "warmup": form.cleaned_data.get("warmup") or 0,
+                    "min_time": form.cleaned_data.get("min_time") or 0.0,
+                }
                 
-                # Run benchmarks
-                results, session_id = benchmark_multiple(
-                    solver_classes, 
-                    problem, 
-                    form.cleaned_data["problem_type"]
+                # Queue the benchmarks for the workers (manage.py run_workers)
+                job = submit_job(
+                    problem,
+                    form.cleaned_data["problem_type"],
+                    selected_algorithms,
+                    solver_options,
+                    trials
                 )
                 
-                if not results:
-                    messages.error(request, "No algorithms completed successfully")
-                    return render(request, "index.html", {"form": form})
-                
-                # Redirect to results page
-                return redirect('results', session_id=session_id)
+                # Redirect to results page, which waits for the job
+                return redirect('results', session_id=job.job_id)
                 
             except Exception as e:
                 messages.error(request, f"Error processing request: {str(e)}")
@@ -64,16 +58,29 @@ def index(request):
 def results(request, session_id):
     try:
         session = BenchmarkSession.objects.get(session_id=session_id)
-        results = OptimizationResult.objects.filter(
-            problem_type=session.problem_type,
-            created_at__gte=session.created_at
-        ).order_by('created_at')
+        job = SolveJob.objects.filter(session=session).first()
+        if job is not None and not job.finished:
+            # Still queued or running: the page polls job_status and reloads
+            return render(request, "results.html", {
+                'session': session,
+                'job': job,
+                'pending': True,
+                'problem_type': session.problem_type
+            })
         
+        results = session.results.order_by('created_at')
+        if job is None and not results.exists():
+            # Sessions stored before results were linked to them
+            results = OptimizationResult.objects.filter(
+                problem_type=session.problem_type,
+                created_at__gte=session.created_at
+            ).order_by('created_at')
         # Prepare data for charts
         chart_data = prepare_chart_data(results)
         
         context = {
             'session': session,
+            'job': job,
             'results': results,
             'chart_data': json.dumps(chart_data),
             'problem_type': session.problem_type
@@ -83,6 +90,43 @@ def results(request, session_id):
         messages.error(request, "Session not found")
         return redirect('index')
 
+def job_status(request, job_id):
+    """JSON status of a solve job, with its results once it is done"""
+    try:
+        job = SolveJob.objects.select_related('session').get(job_id=job_id)
+    except SolveJob.DoesNotExist:
+        return JsonResponse({'error': 'Job not found'}, status=404)
+    
+    data = {
+        'job_id': job.job_id,
+        'status': job.status,
+        'error': job.error,
+        'algorithms': job.algorithms,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'results_url': reverse('results', args=[job.session.session_id]),
+    }
+    if job.status == 'done':
+        data['results'] = [
+            {
+                'algorithm': result.algorithm,
+                'status': result.status,
+                'objective_value': result.objective_value,
+                'runtime_seconds': result.runtime_seconds,
+                'runtime_min': result.runtime_min,
+                'runtime_p95': result.runtime_p95,
+                'runtime_ci': [result.runtime_ci_low, result.runtime_ci_high],
+                'runtime_samples': result.runtime_samples,
+                'cpu_seconds': result.cpu_seconds,
+                'memory_mb': result.memory_mb,
+                'upper_bound': result.upper_bound,
+                'solution': result.solution,
+            }
+            for result in job.session.results.order_by('created_at')
+        ]
+    return JsonResponse(data)
+
 def parse_problem_data(data):
     """Parse problem data from form"""
     problem_type = data["problem_type"]
@@ -208,18 +252,27 @@ def prepare_chart_data(results):
     """Prepare data for visualization charts"""
     algorithms = []
     runtimes = []
+    runtime_cis = []
+    cpu_times = []
     memories = []
     objectives = []
     
     for result in results:
         algorithms.append(result.algorithm)
         runtimes.append(result.runtime_seconds)
+        if result.runtime_ci_low is not None:
+            runtime_cis.append([result.runtime_ci_low, result.runtime_ci_high])
+        else:
+            runtime_cis.append(None)
+        cpu_times.append(result.cpu_seconds)
         memories.append(result.memory_mb)
         objectives.append(result.objective_value)
     
     return {
         'algorithms': algorithms,
         'runtimes': runtimes,
+        'runtime_cis': runtime_cis,
+        'cpu_times': cpu_times,
         'memories': memories,
         'objectives': objectives
     }
@@ -33,4 +33,5 @@ echo.
 echo Application will be available at: http://127.0.0.1:8000/
 echo Press Ctrl+C to stop the server
 echo.
+start "Solver workers" python manage.py run_workers
 python manage.py runserver
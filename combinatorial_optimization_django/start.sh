@@ -34,4 +34,7 @@ echo ""
 echo "Application will be available at: http://127.0.0.1:8000/"
 echo "Press Ctrl+C to stop the server"
 echo ""
+python manage.py run_workers &
+WORKERS_PID=$!
+trap "kill $WORKERS_PID" EXIT
 python manage.py runserver